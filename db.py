@@ -1,6 +1,15 @@
 import mysql.connector
-from flask import g
+from flask import g, has_app_context, has_request_context, request
+from collections import Counter
+from contextlib import contextmanager
+import json
+import logging
 import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger('flytau.db')
 
 # Database configuration
 # Check if we are running on PythonAnywhere
@@ -25,36 +34,346 @@ else:
         'collation': 'utf8mb4_unicode_ci'
     }
 
+# Connection pool settings (can be overridden with environment variables)
+POOL_CONFIG = {
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),          # connections kept open
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', '5')),  # extra connections under load
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),      # seconds to wait for a free connection
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1'      # health check on borrow
+}
+
+# Per-request query accounting: a statement shape repeated this many times is flagged as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', '5'))
+
+# Maximum number of parameter rows sent in one batched statement
+BATCH_CHUNK_SIZE = int(os.getenv('DB_BATCH_CHUNK_SIZE', '500'))
+
+# Session variables applied once per physical connection
+SESSION_STATEMENTS = [
+    # Disable ONLY_FULL_GROUP_BY to allow non-aggregated columns in SELECT list
+    "SET sql_mode=(SELECT REPLACE(@@sql_mode,'ONLY_FULL_GROUP_BY',''))"
+]
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the pool timeout."""
+    pass
+
+class ConnectionPool:
+    """
+    Thread-safe pool of MySQL connections.
+    Keeps up to `pool_size` idle connections open and allows `max_overflow`
+    extra connections under load, which are closed again when returned.
+    """
+
+    def __init__(self, db_config, pool_size=5, max_overflow=5, timeout=10, pre_ping=True, session_statements=()):
+        self.db_config = db_config
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.session_statements = list(session_statements)
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._in_use = 0
+        self._counters = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'failed_health_checks': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0
+        }
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.db_config)
+        try:
+            cursor = conn.cursor()
+            for statement in self.session_statements:
+                cursor.execute(statement)
+            cursor.close()
+        except Exception:
+            # Do not leak a half-configured connection
+            conn.close()
+            raise
+        with self._lock:
+            self._counters['connections_created'] += 1
+        return conn
+
+    def _is_healthy(self, conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _reserve_slot(self):
+        # Returns True if a new physical connection may be opened
+        with self._lock:
+            if self._open < self.pool_size + self.max_overflow:
+                self._open += 1
+                return True
+            return False
+
+    def _free_slot(self):
+        with self._lock:
+            self._open -= 1
+
+    def acquire(self):
+        start = time.monotonic()
+        conn = None
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._free_slot()
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._counters['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout} seconds"
+                    )
+
+        # Replace connections that were dropped by the server while idle
+        if self.pre_ping and not self._is_healthy(conn):
+            with self._lock:
+                self._counters['failed_health_checks'] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+            try:
+                conn = self._connect()
+            except Exception:
+                self._free_slot()
+                raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._in_use += 1
+            self._counters['checkouts'] += 1
+            self._counters['total_wait_time'] += waited
+            self._counters['max_wait_time'] = max(self._counters['max_wait_time'], waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._lock:
+            self._in_use -= 1
+
+        if not discard:
+            try:
+                # Never hand out a connection with an open transaction
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        # Overflow connections are closed instead of being kept idle
+        if discard or self._idle.qsize() >= self.pool_size:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            self._free_slot()
+        else:
+            self._idle.put(conn)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['in_use'] = self._in_use
+            stats['open'] = self._open
+        stats['idle'] = self._idle.qsize()
+        stats['pool_size'] = self.pool_size
+        stats['max_overflow'] = self.max_overflow
+        stats['avg_wait_time'] = (stats['total_wait_time'] / stats['checkouts']) if stats['checkouts'] else 0.0
+        return stats
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, session_statements=SESSION_STATEMENTS, **POOL_CONFIG)
+    return _pool
+
+def get_pool_stats():
+    return get_pool().stats()
+
 def get_db():
     if 'db' not in g:
-        g.db = mysql.connector.connect(**DB_CONFIG)
-        # Disable ONLY_FULL_GROUP_BY to allow non-aggregated columns in SELECT list
-        cursor = g.db.cursor()
-        cursor.execute("SET sql_mode=(SELECT REPLACE(@@sql_mode,'ONLY_FULL_GROUP_BY',''))")
-        cursor.close()
+        g.db = get_pool().acquire()
     return g.db
 
 def close_db(e=None):
     db = g.pop('db', None)
     if db is not None:
-        db.close()
+        get_pool().release(db)
+
+def _record_statement(query, elapsed, rows):
+    # Only requests are accounted (scripts such as init_db run without an app context)
+    if not has_app_context():
+        return
+    stats = g.get('query_stats')
+    if stats is None:
+        stats = g.query_stats = {'statements': 0, 'db_time': 0.0, 'rows': 0, 'shapes': Counter()}
+    stats['statements'] += 1
+    stats['db_time'] += elapsed
+    stats['rows'] += rows
+    # Identical SQL text with different parameters counts as the same shape
+    stats['shapes'][' '.join(query.split())] += 1
+
+def get_query_summary():
+    """
+    Returns the query accounting of the current request:
+    statement count, total DB time, rows returned, repeated statement shapes
+    and the shapes that look like an N+1 pattern.
+    """
+    stats = g.get('query_stats') if has_app_context() else None
+    if stats is None:
+        return {'statements': 0, 'db_time_ms': 0.0, 'rows': 0, 'repeated': [], 'n_plus_one': []}
+
+    repeated = [
+        {'statement': shape, 'count': count}
+        for shape, count in stats['shapes'].most_common()
+        if count > 1
+    ]
+    return {
+        'statements': stats['statements'],
+        'db_time_ms': round(stats['db_time'] * 1000, 2),
+        'rows': stats['rows'],
+        'repeated': repeated,
+        'n_plus_one': [r for r in repeated if r['count'] >= N_PLUS_ONE_THRESHOLD]
+    }
+
+def report_query_stats(response):
+    """
+    after_request hook: adds the query summary as a response header and
+    writes it as a structured log line (a warning when N+1 is detected).
+    """
+    summary = get_query_summary()
+    response.headers['X-DB-Queries'] = (
+        f"count={summary['statements']}; time_ms={summary['db_time_ms']}; "
+        f"rows={summary['rows']}; n_plus_one={len(summary['n_plus_one'])}"
+    )
+
+    log_line = {
+        'event': 'db_queries',
+        'method': request.method if has_request_context() else None,
+        'path': request.path if has_request_context() else None,
+        'status': response.status_code,
+        'statements': summary['statements'],
+        'db_time_ms': summary['db_time_ms'],
+        'rows': summary['rows'],
+        'n_plus_one': summary['n_plus_one']
+    }
+    if summary['n_plus_one']:
+        logger.warning(json.dumps(log_line))
+    else:
+        logger.info(json.dumps(log_line))
+    return response
 
 def query_db(query, args=(), one=False):
+    start = time.perf_counter()
     cursor = get_db().cursor(dictionary=True)
     cursor.execute(query, args)
     rv = cursor.fetchall()
     cursor.close()
+    _record_statement(query, time.perf_counter() - start, len(rv))
     return (rv[0] if rv else None) if one else rv
 
-def execute_db(query, args=()):
+def in_transaction():
+    return g.get('transaction_depth', 0) > 0
+
+@contextmanager
+def transaction():
+    """
+    Unit of work: execute_db / execute_many_db calls inside the block are
+    committed together when it exits, or rolled back together if it raises.
+    Nested blocks join the outermost one.
+
+        with transaction():
+            execute_db(...)
+            execute_db(...)
+    """
+    db = get_db()
+    depth = g.get('transaction_depth', 0)
+    g.transaction_depth = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            db.commit()
+    except Exception:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        g.transaction_depth = depth
+
+def execute_db(query, args=(), rowcount=False):
+    """
+    Runs a write statement and commits it (unless inside a transaction() block).
+    Returns the last inserted id, or the number of affected rows if rowcount=True.
+    """
+    start = time.perf_counter()
     db = get_db()
     cursor = db.cursor()
     try:
         cursor.execute(query, args)
-        db.commit()
-        return cursor.lastrowid
+        # Inside a transaction() block the commit happens when the block exits
+        if not in_transaction():
+            db.commit()
+        _record_statement(query, time.perf_counter() - start, 0)
+        return cursor.rowcount if rowcount else cursor.lastrowid
+    except Exception as e:
+        if not in_transaction():
+            db.rollback()
+        raise e
+    finally:
+        cursor.close()
+
+def execute_batches(cursor, query, rows, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Sends `rows` through cursor.executemany in chunks of `chunk_size`.
+    For INSERT ... VALUES statements the connector rewrites each chunk into a
+    single multi-row INSERT. Does not commit. Returns the number of affected rows.
+    """
+    rows = list(rows)
+    affected = 0
+    for i in range(0, len(rows), chunk_size):
+        cursor.executemany(query, rows[i:i + chunk_size])
+        affected += cursor.rowcount
+    return affected
+
+def execute_many_db(query, rows, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Bulk version of execute_db: runs `query` for every parameter tuple in `rows`
+    using batched statements and a single commit.
+    """
+    start = time.perf_counter()
+    db = get_db()
+    cursor = db.cursor()
+    try:
+        affected = execute_batches(cursor, query, rows, chunk_size)
+        if not in_transaction():
+            db.commit()
+        _record_statement(query, time.perf_counter() - start, 0)
+        return affected
     except Exception as e:
-        db.rollback()
+        if not in_transaction():
+            db.rollback()
         raise e
     finally:
         cursor.close()
@@ -1,5 +1,26 @@
 import mysql.connector
-from db import DB_CONFIG
+from db import DB_CONFIG, execute_batches
+from migrate import baseline
+from services.flight_service import INSERT_SEAT_SQL, generate_seat_rows
+from services.seat_inventory import RECOUNT_SEATS_SQL
+
+# Marker in seed.sql where the seats of all seeded aircraft are generated
+GENERATE_SEATS_MARKER = '-- @generate_seats'
+
+def generate_seats(cursor):
+    # Generate Seat rows for every cabin class that has none yet
+    cursor.execute("""
+        SELECT AC.aircraft_id, AC.is_business, AC.num_rows, AC.num_columns
+        FROM Aircraft_Class AC
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Seat S
+            WHERE S.aircraft_id = AC.aircraft_id AND S.is_business = AC.is_business
+        )
+    """)
+    seat_rows = []
+    for aircraft_id, is_business, num_rows, num_columns in cursor.fetchall():
+        seat_rows += generate_seat_rows(aircraft_id, is_business, num_rows, num_columns)
+    return execute_batches(cursor, INSERT_SEAT_SQL, seat_rows)
 
 def init_db():
     print("Connecting to database...")
@@ -35,12 +56,24 @@ def init_db():
     print("Inserting seed data...")
     statements = seed_sql.split(';')
     for statement in statements:
+        if GENERATE_SEATS_MARKER in statement:
+            print("Generating seats...")
+            seat_count = generate_seats(cursor)
+            print(f"{seat_count} seats generated.")
         if statement.strip():
             try:
                 cursor.execute(statement)
             except mysql.connector.errors.IntegrityError:
                 # Ignore errors if data already exists (optional safety)
                 pass
+
+    # Initialize the seat counters of the seeded flights
+    print("Counting seats...")
+    cursor.execute(RECOUNT_SEATS_SQL)
+
+    # sql/schema.sql already includes every migration
+    print("Recording migrations...")
+    baseline(cursor)
             
     conn.commit()
     conn.close()
@@ -1,11 +1,14 @@
 import os
+import logging
 from flask import Flask
 from flask_session import Session
 from datetime import timedelta
-from db import close_db
+from db import close_db, report_query_stats
 from routes.auth import auth_bp
 from routes.customer import customer_bp
 from routes.manager import manager_bp
+from services import reference_cache
+from services.status_sweeper import start_status_sweeper
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key_here'  # Change this for production
@@ -29,10 +32,31 @@ Session(app)
 # Register the teardown context to close DB connection
 app.teardown_appcontext(close_db)
 
+# Report per-request query accounting (X-DB-Queries header + structured log line)
+logging.basicConfig(level=logging.INFO)
+app.after_request(report_query_stats)
+
 # Register Blueprints
 app.register_blueprint(auth_bp)
 app.register_blueprint(customer_bp)
 app.register_blueprint(manager_bp)
 
+# Mark departed flights as 'Completed' in the background instead of on every request.
+# One sweeper is enough for the whole site: it is started by `python main.py` (in the
+# reloader's serving process only), or at import when STATUS_SWEEPER_ENABLED=1 is set
+# on exactly one process of a multi-process server
+if os.getenv('STATUS_SWEEPER_ENABLED') == '1':
+    start_status_sweeper(app)
+
+# Build the airport search index once at startup (it is rebuilt with the reference cache)
+try:
+    with app.app_context():
+        reference_cache.warm('airports')
+except Exception:
+    logging.getLogger('flytau').exception("Could not preload airports")
+
 if __name__ == '__main__':
+    # With debug=True the reloader runs this file twice; only its child serves requests
+    if os.getenv('STATUS_SWEEPER_ENABLED') != '1' and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_status_sweeper(app)
     app.run(debug=True)
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+from datetime import datetime, timedelta
+import mysql.connector
+from db import DB_CONFIG
+from services.seat_inventory import RECOUNT_SEATS_SQL
+
+# Versioned schema changes: sql/migrations/<version>_<name>.sql, applied in version
+# order and recorded in Schema_Migration. init_db.py builds the current schema from
+# sql/schema.sql, so it records every migration as applied (baseline). The chain
+# starts from the original schema: a database created before migrations existed has
+# no Schema_Migration table and gets every migration.
+MIGRATIONS_DIR = os.path.join('sql', 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+# Marker in a migration file: recount every flight's seat counters after its statements
+RECOUNT_SEATS_MARKER = '-- @recount_seats'
+
+# Databases created before the migration table existed get it on first run
+CREATE_MIGRATION_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS Schema_Migration (
+        version INT PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at DATETIME NOT NULL
+    )
+"""
+
+# The query check only reports a scan the optimizer chose over a usable index above
+# this many rows: on a small development database a scan is often the cheaper plan
+EXPLAIN_SMALL_TABLE_ROWS = int(os.getenv('EXPLAIN_SMALL_TABLE_ROWS', '1000'))
+
+def connect():
+    return mysql.connector.connect(
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        host=DB_CONFIG['host'],
+        database=DB_CONFIG['database']
+    )
+
+def list_migrations():
+    """Returns [(version, name, path)] of the migration files, in version order."""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+def split_statements(sql):
+    """Splits a migration file into statements (comment lines are dropped first)."""
+    code = '\n'.join(line for line in sql.splitlines() if not line.strip().startswith('--'))
+    return [statement.strip() for statement in code.split(';') if statement.strip()]
+
+def applied_versions(cursor):
+    cursor.execute(CREATE_MIGRATION_TABLE_SQL)
+    cursor.execute("SELECT version FROM Schema_Migration")
+    return {row[0] for row in cursor.fetchall()}
+
+def record_migration(cursor, version, name):
+    cursor.execute("""
+        INSERT IGNORE INTO Schema_Migration (version, name, applied_at) VALUES (%s, %s, NOW())
+    """, (version, name))
+
+def baseline(cursor):
+    """Records every migration as applied, for a database built from sql/schema.sql."""
+    cursor.execute(CREATE_MIGRATION_TABLE_SQL)
+    for version, name, _ in list_migrations():
+        record_migration(cursor, version, name)
+
+def migrate():
+    conn = connect()
+    cursor = conn.cursor()
+    applied = applied_versions(cursor)
+    pending = [m for m in list_migrations() if m[0] not in applied]
+    if not pending:
+        print("Database is up to date.")
+
+    for version, name, path in pending:
+        print(f"Applying {version:03d}_{name}...")
+        with open(path, 'r') as f:
+            sql = f.read()
+        # MySQL commits DDL implicitly: a migration that fails halfway is not
+        # recorded and has to be completed by hand before running again
+        for statement in split_statements(sql):
+            cursor.execute(statement)
+        if RECOUNT_SEATS_MARKER in sql:
+            print("Counting seats...")
+            cursor.execute(RECOUNT_SEATS_SQL)
+        record_migration(cursor, version, name)
+        conn.commit()
+
+    conn.close()
+    print("Migrations complete.")
+
+def status():
+    conn = connect()
+    cursor = conn.cursor()
+    applied = applied_versions(cursor)
+    conn.close()
+    for version, name, _ in list_migrations():
+        print(f"{'applied' if version in applied else 'pending'}  {version:03d}_{name}")
+
+def hot_queries():
+    """(name, sql, params) of the service queries the secondary indexes are for."""
+    from services import flight_service, reports_service
+    from routes.customer import orders
+
+    now = datetime.now()
+    day = datetime(now.year, now.month, now.day) + timedelta(days=1)
+    return [
+        ('aircraft availability (previous flights)', flight_service.PREVIOUS_AIRCRAFT_FLIGHTS_SQL, (now,)),
+        ('aircraft availability (next flights)', flight_service.NEXT_AIRCRAFT_FLIGHTS_SQL, (now,)),
+        ('crew availability (previous assignments)', flight_service.PREVIOUS_CREW_FLIGHTS_SQL, (now,)),
+        ('crew availability (next assignments)', flight_service.NEXT_CREW_FLIGHTS_SQL, (now,)),
+        ('flight search by date',
+         flight_service.SEARCH_FLIGHTS_SQL + " AND F.departure_time >= %s AND F.departure_time < %s"
+         + flight_service.SEARCH_ORDER_SQL,
+         (day, day + timedelta(days=1), flight_service.SEARCH_PAGE_SIZE + 1)),
+        ('my orders',
+         orders.MY_ORDERS_SELECT_SQL + orders.MY_ORDERS_FROM_SQL + orders.MY_ORDERS_ORDER_SQL,
+         ('customer@example.com', orders.MY_ORDERS_PAGE_SIZE + 1)),
+        ('cancellation report', reports_service.CANCELLATION_REPORT_SQL, ()),
+    ]
+
+def full_scans(plan):
+    """Describes the steps of an EXPLAIN plan that read a whole table or a whole index."""
+    problems = []
+    for step in plan:
+        table = step.get('table')
+        if not table or table.startswith('<'):
+            # Derived tables and temporary results
+            continue
+        access = step.get('type')
+        extra = [item.strip() for item in (step.get('Extra') or '').split(';')]
+        # A full scan of a covering index is accepted: it reads no table rows
+        if access == 'ALL' or (access == 'index' and 'Using index' not in extra):
+            if step.get('possible_keys') and (step.get('rows') or 0) < EXPLAIN_SMALL_TABLE_ROWS:
+                continue
+            scan = 'full table scan' if access == 'ALL' else 'full index scan'
+            problems.append(f"{table}: {scan} of ~{step.get('rows')} rows")
+    return problems
+
+def check():
+    """Runs EXPLAIN on the hot service queries. Returns False if one falls back to a full scan."""
+    conn = connect()
+    cursor = conn.cursor(dictionary=True)
+    ok = True
+    for name, sql, params in hot_queries():
+        cursor.execute("EXPLAIN " + sql, params)
+        problems = full_scans(cursor.fetchall())
+        if problems:
+            ok = False
+            print(f"FAIL  {name}")
+            for problem in problems:
+                print(f"      {problem}")
+        else:
+            print(f"ok    {name}")
+    conn.close()
+    return ok
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'migrate'
+    if command == 'migrate':
+        migrate()
+    elif command == 'status':
+        status()
+    elif command == 'check':
+        sys.exit(0 if check() else 1)
+    else:
+        print("Usage: python migrate.py [migrate|status|check]")
+        sys.exit(2)
@@ -1,5 +1,5 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
-from db import query_db, execute_db
+from db import query_db, execute_db, transaction
 import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -86,32 +86,34 @@ def register():
             return redirect(url_for('auth.register'))
             
         try:
-            # Check if email exists in User (Guest)
-            existing_user = query_db('SELECT email FROM User WHERE email = %s', (email,), one=True)
+            # User, phone and customer rows are committed together
+            with transaction():
+                # Check if email exists in User (Guest)
+                existing_user = query_db('SELECT email FROM User WHERE email = %s', (email,), one=True)
             
-            if existing_user:
-                # Update User details
-                execute_db('UPDATE User SET first_name=%s, middle_name=%s, last_name=%s WHERE email=%s',
-                           (first_name, middle_name, last_name, email))
-                flash_message = 'Registration successful! We found previous bookings linked to your email.'
-            else:
-                # Insert into User
-                execute_db('INSERT INTO User (email, first_name, middle_name, last_name) VALUES (%s, %s, %s, %s)',
-                           (email, first_name, middle_name, last_name))
-                flash_message = 'Registration successful! Please log in.'
+                if existing_user:
+                    # Update User details
+                    execute_db('UPDATE User SET first_name=%s, middle_name=%s, last_name=%s WHERE email=%s',
+                               (first_name, middle_name, last_name, email))
+                    flash_message = 'Registration successful! We found previous bookings linked to your email.'
+                else:
+                    # Insert into User
+                    execute_db('INSERT INTO User (email, first_name, middle_name, last_name) VALUES (%s, %s, %s, %s)',
+                               (email, first_name, middle_name, last_name))
+                    flash_message = 'Registration successful! Please log in.'
             
-            # Insert into Phone
-            if phone:
-                # Check if phone exists for this user to avoid duplicates if guest provided it (though schema says PK is email, phone)
-                # But guest booking might not capture phone in Phone table? Need to check booking logic.
-                # Assuming we just insert. If it fails due to PK, we might need to handle it.
-                # Let's check if phone exists first to be safe.
-                if not query_db('SELECT * FROM Phone WHERE email = %s AND phone_number = %s', (email, phone), one=True):
-                    execute_db('INSERT INTO Phone (email, phone_number) VALUES (%s, %s)', (email, phone))
+                # Insert into Phone
+                if phone:
+                    # Check if phone exists for this user to avoid duplicates if guest provided it (though schema says PK is email, phone)
+                    # But guest booking might not capture phone in Phone table? Need to check booking logic.
+                    # Assuming we just insert. If it fails due to PK, we might need to handle it.
+                    # Let's check if phone exists first to be safe.
+                    if not query_db('SELECT * FROM Phone WHERE email = %s AND phone_number = %s', (email, phone), one=True):
+                        execute_db('INSERT INTO Phone (email, phone_number) VALUES (%s, %s)', (email, phone))
                 
-            # Insert into Registered_Customer
-            execute_db('INSERT INTO Registered_Customer (email, passport_number, birth_date, registration_date, password) VALUES (%s, %s, %s, %s, %s)',
-                       (email, passport, dob, datetime.date.today(), password))
+                # Insert into Registered_Customer
+                execute_db('INSERT INTO Registered_Customer (email, passport_number, birth_date, registration_date, password) VALUES (%s, %s, %s, %s, %s)',
+                           (email, passport, dob, datetime.date.today(), password))
             
             flash(flash_message, 'success')
             return redirect(url_for('auth.login'))
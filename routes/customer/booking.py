@@ -1,12 +1,133 @@
-from flask import render_template, request, redirect, url_for, flash, session
-from db import query_db, execute_db
-import random
+from flask import render_template, request, redirect, url_for, flash, session, jsonify, current_app, Response, stream_with_context
+import mysql.connector
+from db import query_db, execute_db, transaction, close_db
 from datetime import datetime
 from routes.customer import customer_bp
-from services.flight_service import update_flight_statuses
+from services import reference_cache, seat_events
+from services.seat_inventory import reserve_seats, get_seat_map, record_seats
+from services.order_codes import next_order_code
+from services.seat_holds import new_hold_token, hold_seats, release_holds, get_held_seats, SEAT_HOLD_TTL
+
+def _hold_token():
+    # Identifies this browser's seat holds across requests
+    token = session.get('seat_hold_token')
+    if not token:
+        token = session['seat_hold_token'] = new_hold_token()
+    return token
+
+def _seat_label(seat):
+    is_business, row, col = seat
+    return f"{'Business' if is_business else 'Economy'} {row}{col}"
+
+_FLIGHT_SQL = """
+    SELECT flight_id, aircraft_id, economy_price, business_price, departure_time, inventory_version
+    FROM Flight
+"""
+
+def _get_flight(flight_id):
+    return query_db(_FLIGHT_SQL + " WHERE flight_id = %s", (flight_id,), one=True)
+
+def _find_flight(source_id, dest_id, time_str):
+    # Booking pages are linked by route and departure time (uq_flight_key)
+    return query_db(_FLIGHT_SQL + " WHERE source_airport_id = %s AND dest_airport_id = %s AND departure_time = %s",
+                    (source_id, dest_id, time_str), one=True)
+
+@customer_bp.route('/api/seat_map')
+def seat_map_data():
+    flight_id = request.args.get('flight_id', type=int)
+    
+    if not flight_id:
+        return jsonify({'error': 'Missing parameters'}), 400
+    
+    flight = _get_flight(flight_id)
+    if not flight:
+        return jsonify({'error': 'Flight not found'}), 404
+    
+    # The payload only changes with the flight's inventory version:
+    # answer revalidations before touching the seat map
+    etag = f"{flight_id}-{flight['inventory_version']}"
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        seat_map = get_seat_map(flight_id, flight['aircraft_id'], flight['inventory_version'])
+        response = jsonify(seat_map.to_dict())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@customer_bp.route('/api/seat_map/stream')
+def seat_map_stream():
+    flight_id = request.args.get('flight_id', type=int)
+    
+    if not flight_id:
+        return jsonify({'error': 'Missing parameters'}), 400
+    
+    flight = _get_flight(flight_id)
+    # The request context lives as long as the stream: hand the connection back now
+    close_db()
+    if not flight:
+        return jsonify({'error': 'Flight not found'}), 404
+    
+    # Seat-taken / seat-released deltas for this flight, from this process only (see
+    # services/seat_events.py); no database access while streaming. Streams are closed
+    # after a few minutes: the browser reconnects with the last version it saw
+    last_version = request.headers.get('Last-Event-ID', type=int)
+    events = seat_events.stream_events(flight_id, flight['inventory_version'], last_version)
+    response = Response(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@customer_bp.route('/api/seat_map/suggest')
+def suggest_seats():
+    flight_id = request.args.get('flight_id', type=int)
+    count = request.args.get('count', type=int)
+    
+    if not flight_id or not count or count < 1:
+        return jsonify({'error': 'Missing parameters'}), 400
+    
+    flight = _get_flight(flight_id)
+    if not flight:
+        return jsonify({'error': 'Flight not found'}), 404
+    
+    seat_map = get_seat_map(flight_id, flight['aircraft_id'], flight['inventory_version'])
+    # Seats other customers are holding are not suggested
+    held = get_held_seats(flight_id, exclude_token=session.get('seat_hold_token'))
+    suggestions = seat_map.suggest_adjacent(count, held)
+    return jsonify({
+        'business' if is_business else 'economy': (
+            [{'row': row, 'col': col} for row, col in seats] if seats else None
+        )
+        for is_business, seats in suggestions.items()
+    })
+
+@customer_bp.route('/api/seat_hold', methods=['POST'])
+def seat_hold():
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        flight_id = int(data['flight_id'])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Missing parameters'}), 400
+    
+    try:
+        seats = [(s['class'] == 'business', int(s['row']), int(s['col'])) for s in data.get('seats', [])]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Invalid seats'}), 400
+    
+    if not _get_flight(flight_id):
+        return jsonify({'error': 'Flight not found'}), 404
+    
+    # Replaces this browser's holds on the flight with the current selection
+    conflicts = hold_seats(_hold_token(), flight_id, seats)
+    return jsonify({
+        'success': not conflicts,
+        'conflicts': [{'class': 'business' if is_business else 'economy', 'row': row, 'col': col}
+                      for is_business, row, col in conflicts],
+        'expires_in': SEAT_HOLD_TTL
+    })
 
 @customer_bp.route('/book_flight', methods=['GET', 'POST'])
-@update_flight_statuses
 def book_flight():
     if 'user_id' in session and session.get('role') == 'manager':
         flash('Managers cannot book flights. Please log in as a customer to make a booking.', 'warning')
@@ -43,53 +164,27 @@ def book_flight():
         seat_rows = request.form.getlist('seat_row')
         seat_cols = request.form.getlist('seat_col')
         seat_classes = request.form.getlist('seat_class')
+        if not seat_classes or not (len(seat_rows) == len(seat_cols) == len(seat_classes)):
+            flash('Please select your seats.', 'danger')
+            return redirect(request.url)
+        seats = [(s_class == 'business', seat_rows[i], seat_cols[i]) for i, s_class in enumerate(seat_classes)]
         
         # If user is logged in as customer, use their email
         is_logged_in = 'user_id' in session and session.get('role') == 'customer'
         if is_logged_in:
             email = session['user_id']
         
-        # 1. Ensure User Exists (or create dummy user for non-registered)
-        user_check = query_db("SELECT email FROM User WHERE email = %s", (email,))
-        if not user_check:
-            # Create new user
-            execute_db("INSERT INTO User (email, first_name, last_name) VALUES (%s, %s, %s)", 
-                     (email, first_name, last_name))
-            execute_db("INSERT INTO Phone (email, phone_number) VALUES (%s, %s)", (email, phone))
-        else:
-            # User exists - update their information if logged in
-            if is_logged_in:
-                # Update User table with new first_name and last_name
-                execute_db("UPDATE User SET first_name=%s, last_name=%s WHERE email=%s", 
-                         (first_name, last_name, email))
-                
-                # Handle phone number - check if it already exists for this user
-                existing_phone = query_db("SELECT phone_number FROM Phone WHERE email=%s AND phone_number=%s", 
-                                         (email, phone), one=True)
-                
-                if not existing_phone:
-                    # Phone number doesn't exist, add it
-                    # Since schema allows multiple phone numbers, we'll insert the new one
-                    try:
-                        execute_db("INSERT INTO Phone (email, phone_number) VALUES (%s, %s)", (email, phone))
-                    except Exception:
-                        # If insert fails (e.g., duplicate), that's okay - phone already exists
-                        pass
-            
-        # 2. Create Order
-        order_code = random.randint(100000, 999999)
-        
         # Get price and aircraft_id
-        flight_info = query_db(f"SELECT economy_price, business_price, aircraft_id FROM Flight WHERE source_airport_id=%s AND dest_airport_id=%s AND departure_time=%s", 
-                               (source_id, dest_id, time_str))
+        flight_info = _find_flight(source_id, dest_id, time_str)
         
         if not flight_info:
             flash("Flight not found.", "danger")
             return redirect(url_for('customer.index'))
             
-        economy_price = flight_info[0]['economy_price']
-        business_price = flight_info[0]['business_price']
-        aircraft_id = flight_info[0]['aircraft_id']
+        flight_id = flight_info['flight_id']
+        economy_price = flight_info['economy_price']
+        business_price = flight_info['business_price']
+        aircraft_id = flight_info['aircraft_id']
         
         total_price = 0
         for s_class in seat_classes:
@@ -98,103 +193,122 @@ def book_flight():
             else:
                 total_price += economy_price
         
-        execute_db("""
-            INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, source_airport_id, dest_airport_id, departure_time)
-            VALUES (%s, NOW(), %s, 'Confirmed', %s, %s, %s, %s)
-        """, (order_code, total_price, email, source_id, dest_id, time_str))
-        
-        # 3. Book Seats
+        # User, order and seats are written in one transaction:
+        # a failure anywhere rolls back the whole booking
         try:
-            for i in range(len(seat_rows)):
-                row = seat_rows[i]
-                col = seat_cols[i]
-                s_class = seat_classes[i]
-                is_business = (s_class == 'business')
+            order_code = next_order_code()
+            
+            # 1. Confirm the seat holds (takes them now if they expired and the seats are still free).
+            # Committed on its own before the booking transaction, which therefore starts
+            # without locks and takes the flight row lock only in step 3
+            token = _hold_token()
+            conflicts = hold_seats(token, flight_id, seats)
+            if conflicts:
+                raise ValueError("Seat(s) no longer available: " + ", ".join(_seat_label(s) for s in conflicts))
+            
+            with transaction():
+                # 2. Ensure User Exists (or create dummy user for non-registered)
+                user_check = query_db("SELECT email FROM User WHERE email = %s", (email,))
+                if not user_check:
+                    # Create new user
+                    execute_db("INSERT INTO User (email, first_name, last_name) VALUES (%s, %s, %s)", 
+                             (email, first_name, last_name))
+                    execute_db("INSERT INTO Phone (email, phone_number) VALUES (%s, %s)", (email, phone))
+                else:
+                    # User exists - update their information if logged in
+                    if is_logged_in:
+                        # Update User table with new first_name and last_name
+                        execute_db("UPDATE User SET first_name=%s, last_name=%s WHERE email=%s", 
+                                 (first_name, last_name, email))
+                        
+                        # Handle phone number - check if it already exists for this user
+                        existing_phone = query_db("SELECT phone_number FROM Phone WHERE email=%s AND phone_number=%s", 
+                                                 (email, phone), one=True)
+                        
+                        if not existing_phone:
+                            # Phone number doesn't exist, add it
+                            # Since schema allows multiple phone numbers, we'll insert the new one
+                            try:
+                                execute_db("INSERT INTO Phone (email, phone_number) VALUES (%s, %s)", (email, phone))
+                            except Exception:
+                                # If insert fails (e.g., duplicate), that's okay - phone already exists
+                                pass
+                
+                # 3. Take the seats from the flight's inventory (locks the flight row)
+                business_count = sum(1 for s_class in seat_classes if s_class == 'business')
+                economy_count = len(seat_classes) - business_count
+                inventory_version = reserve_seats(flight_id, economy_count, business_count)
+                if inventory_version is None:
+                    raise ValueError("Not enough seats left on this flight.")
                 
+                # 4. Create Order
                 execute_db("""
-                    INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (order_code, aircraft_id, is_business, row, col))
+                    INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, flight_id, source_airport_id, dest_airport_id, departure_time)
+                    VALUES (%s, NOW(), %s, 'Confirmed', %s, %s, %s, %s, %s)
+                """, (order_code, total_price, email, flight_id, source_id, dest_id, flight_info['departure_time']))
+                
+                # 5. Book Seats
+                for i in range(len(seat_rows)):
+                    row = seat_rows[i]
+                    col = seat_cols[i]
+                    s_class = seat_classes[i]
+                    is_business = (s_class == 'business')
+                    
+                    # uq_order_seats_live rejects a seat already taken by another live order
+                    execute_db("""
+                        INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`, flight_id, is_live)
+                        VALUES (%s, %s, %s, %s, %s, %s, 1)
+                    """, (order_code, aircraft_id, is_business, row, col, flight_id))
+                
+                # 6. The holds became an order
+                release_holds(token, flight_id)
             
+            # Committed: apply the booking to the cached seat map
+            record_seats(flight_id, inventory_version, seats)
             booking_success = True
             new_order_code = order_code
             
+        except mysql.connector.errors.IntegrityError as e:
+            if 'uq_order_seats_live' in str(e):
+                flash("Booking failed: one of the selected seats was just booked by another customer.", "danger")
+            else:
+                flash(f"Booking failed: {e}", "danger")
+            return redirect(request.url)
         except Exception as e:
-            # Rollback order if seat booking fails (simplified)
-            execute_db("DELETE FROM Order_Table WHERE order_code = %s", (order_code,))
             flash(f"Booking failed: {e}", "danger")
             return redirect(request.url)
 
     # GET Request - Show Seat Map
     
-    # 1. Get Flight Info & Aircraft Config for BOTH classes
-    flight_query = """
-        SELECT F.aircraft_id, AC.is_business, AC.num_rows, AC.num_columns, F.economy_price, F.business_price,
-               A1.airport_name as source_airport, A2.airport_name as dest_airport, FR.flight_duration, Aircraft.manufacturer
-        FROM Flight F
-        JOIN Aircraft_Class AC ON F.aircraft_id = AC.aircraft_id
-        JOIN Airport A1 ON F.source_airport_id = A1.airport_id
-        JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
-        JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id AND F.dest_airport_id = FR.dest_airport_id
-        JOIN Aircraft ON F.aircraft_id = Aircraft.aircraft_id
-        WHERE F.source_airport_id = %s AND F.dest_airport_id = %s AND F.departure_time = %s
-    """
-    flight_data = query_db(flight_query, (source_id, dest_id, time_str))
-    
-    if not flight_data:
+    # 1. Get Flight Info (airport, route and aircraft details come from the reference cache)
+    flight = _find_flight(source_id, dest_id, time_str)
+    
+    if not flight:
         flash("Flight details not found.", "danger")
         return redirect(url_for('customer.index'))
-        
-    configs = {}
-    economy_price = 0
-    business_price = 0
+    
+    # 2. Seat occupancy for ALL classes, cached per flight and inventory version
+    seat_map = get_seat_map(flight['flight_id'], flight['aircraft_id'], flight['inventory_version'])
+    economy_cabin = seat_map.cabin(False)
+    business_cabin = seat_map.cabin(True)
+    
+    if not economy_cabin and not business_cabin:
+        flash("Flight details not found.", "danger")
+        return redirect(url_for('customer.index'))
+    
+    aircraft = reference_cache.get_aircraft(flight['aircraft_id'])
     flight_details = {
-        'source': flight_data[0]['source_airport'],
-        'dest': flight_data[0]['dest_airport'],
-        'duration': flight_data[0]['flight_duration'],
-        'aircraft': flight_data[0]['manufacturer']
+        'source': reference_cache.get_airport_name(source_id),
+        'dest': reference_cache.get_airport_name(dest_id),
+        'duration': reference_cache.get_route_duration(source_id, dest_id),
+        'aircraft': aircraft['manufacturer'] if aircraft else "Unknown"
     }
+    economy_price = flight['economy_price'] if economy_cabin else 0
+    business_price = flight['business_price'] if business_cabin else 0
     
-    for row in flight_data:
-        is_biz = (row['is_business'] == 1)
-        configs[is_biz] = {'rows': row['num_rows'], 'cols': row['num_columns']}
-        if is_biz:
-            business_price = row['business_price']
-        else:
-            economy_price = row['economy_price']
-    
-    # 2. Get Occupied Seats for ALL classes
-    occupied_query = """
-        SELECT OS.row_number, OS.column_number, OS.is_business
-        FROM Order_Seats OS
-        JOIN Order_Table O ON OS.order_code = O.order_code
-        WHERE O.source_airport_id = %s AND O.dest_airport_id = %s AND O.departure_time = %s
-        AND O.order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
-    """
-    occupied_seats = query_db(occupied_query, (source_id, dest_id, time_str))
-    
-    occupied_economy = set()
-    occupied_business = set()
-    
-    for s in occupied_seats:
-        if s['is_business']:
-            occupied_business.add((s['row_number'], s['column_number']))
-        else:
-            occupied_economy.add((s['row_number'], s['column_number']))
-            
     # Calculate Availability
-    has_economy = False
-    has_business = False
-    
-    if False in configs:
-        total_eco = configs[False]['rows'] * configs[False]['cols']
-        if len(occupied_economy) < total_eco:
-            has_economy = True
-            
-    if True in configs:
-        total_biz = configs[True]['rows'] * configs[True]['cols']
-        if len(occupied_business) < total_biz:
-            has_business = True
+    has_economy = seat_map.has_free(False)
+    has_business = seat_map.has_free(True)
             
     # Get user details if logged in (including all phone numbers)
     user_details = None
@@ -219,13 +333,13 @@ def book_flight():
             user_details['phone_numbers'] = [p['phone_number'] for p in phone_numbers] if phone_numbers else []
     
     return render_template('customer/book_flight.html', 
-                           configs=configs,
-                           occupied_economy=occupied_economy,
-                           occupied_business=occupied_business,
+                           economy_cabin=economy_cabin,
+                           business_cabin=business_cabin,
                            economy_price=economy_price,
                            business_price=business_price,
                            has_economy=has_economy,
                            has_business=has_business,
+                           flight_id=flight['flight_id'],
                            source_id=source_id,
                            dest_id=dest_id,
                            time=time_str,
@@ -1,14 +1,14 @@
-from flask import render_template, request
-from db import query_db
-from datetime import date
+from flask import render_template, request, jsonify
+from datetime import date, MAXYEAR
 from routes.customer import customer_bp
-from services.flight_service import update_flight_statuses
+from services import reference_cache
+from services.connection_search import find_connections
+from services.fare_calendar import get_fare_calendar
+from services.flight_service import search_flights
 
 @customer_bp.route('/')
-@update_flight_statuses
 def index():
     # Managers can view flights but cannot book them
-    airports = query_db("SELECT airport_name FROM Airport")
     
     # Search Logic
     source = request.args.get('source')
@@ -18,56 +18,59 @@ def index():
     max_price = request.args.get('max_price')
     flight_class = request.args.get('class')
     show_all = request.args.get('show_all')
+    after = request.args.get('after')
     
     flights = None
+    next_cursor = None
+    connections = None
     
     if source or dest or search_date or min_price or max_price or show_all:
-        query = """
-            SELECT 
-                F.source_airport_id, F.dest_airport_id, F.departure_time,
-                F.economy_price, F.business_price, F.flight_status,
-                A1.airport_name as source_airport,
-                A2.airport_name as dest_airport,
-                AC.manufacturer, AC.is_large,
-                FR.flight_duration
-            FROM Flight F
-            JOIN Airport A1 ON F.source_airport_id = A1.airport_id
-            JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
-            JOIN Aircraft AC ON F.aircraft_id = AC.aircraft_id
-            JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id AND F.dest_airport_id = FR.dest_airport_id
-            WHERE F.flight_status = 'Active'
-        """
-        params = []
+        flights, next_cursor = search_flights(source, dest, search_date, min_price, max_price,
+                                              flight_class, after)
         
-        if source:
-            query += " AND A1.airport_name LIKE %s"
-            params.append(f"%{source}%")
-        if dest:
-            query += " AND A2.airport_name LIKE %s"
-            params.append(f"%{dest}%")
-        if search_date:
-            query += " AND DATE(F.departure_time) = %s"
-            params.append(search_date)
-            
-        if min_price:
-            if flight_class == 'Business':
-                query += " AND F.business_price >= %s"
-            else:
-                query += " AND F.economy_price >= %s"
-            params.append(min_price)
-            
-        if max_price:
-            if flight_class == 'Business':
-                query += " AND F.business_price <= %s"
-            else:
-                query += " AND F.economy_price <= %s"
-            params.append(max_price)
-
-        query += " ORDER BY F.departure_time"
-        flights = query_db(query, tuple(params))
+        # No direct flight between the two airports: offer connecting itineraries
+        if not flights and not after and source and dest:
+            source_ids = reference_cache.find_airport_ids(source)
+            dest_ids = reference_cache.find_airport_ids(dest)
+            if source_ids and dest_ids:
+                connections = find_connections(source_ids, dest_ids, search_date, flight_class,
+                                               min_price, max_price)
     
     # Pass today's date for the min attribute in date input
     today_date = date.today().isoformat()
 
-    return render_template('customer/index.html', airports=airports, flights=flights, today_date=today_date)
+    return render_template('customer/index.html', flights=flights, today_date=today_date,
+                           next_cursor=next_cursor, is_first_page=not after, connections=connections)
+
+@customer_bp.route('/api/fare_calendar')
+def fare_calendar():
+    # Cheapest economy and business fare per day of a month, for a source/destination search
+    source = request.args.get('source')
+    dest = request.args.get('dest')
+    month = request.args.get('month') or date.today().strftime('%Y-%m')
+    
+    if not source or not dest:
+        return jsonify({'error': 'Missing parameters'}), 400
+    
+    try:
+        year, month_number = (int(part) for part in month.split('-'))
+        date(year, month_number, 1)
+        # The calendar also needs the first day of the following month
+        if (year, month_number) == (MAXYEAR, 12):
+            raise ValueError(month)
+    except ValueError:
+        return jsonify({'error': 'Invalid month'}), 400
+    
+    # Airport names match the same way as in the search form
+    source_ids = reference_cache.find_airport_ids(source)
+    dest_ids = reference_cache.find_airport_ids(dest)
+    route_pairs = [(s, d) for s in source_ids for d in dest_ids if s != d]
+    
+    days = get_fare_calendar().month(route_pairs, year, month_number)
+    return jsonify({'month': f"{year:04d}-{month_number:02d}", 'days': days})
 
+@customer_bp.route('/api/airports')
+def airport_autocomplete():
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    return jsonify(reference_cache.search_airports(query, limit))
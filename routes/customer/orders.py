@@ -1,7 +1,9 @@
 from flask import render_template, request, redirect, url_for, flash, session
-from db import query_db, execute_db
+from db import query_db, execute_db, transaction
 from datetime import datetime
 from routes.customer import customer_bp
+from services.flight_service import get_all_airports
+from services.seat_inventory import release_order_seats, record_seats
 
 @customer_bp.route('/track_order', methods=['GET', 'POST'])
 def track_order():
@@ -37,6 +39,51 @@ def track_order():
             
     return render_template('customer/track_order.html', order=order)
 
+MY_ORDERS_PAGE_SIZE = 50
+
+# A customer's orders; my_orders appends its filters to MY_ORDERS_FROM_SQL
+# and pages through them in MY_ORDERS_ORDER_SQL order (idx_order_customer)
+MY_ORDERS_SELECT_SQL = """
+    SELECT 
+        O.order_code, 
+        O.order_date, 
+        O.total_payment, 
+        O.order_status, 
+        O.departure_time,
+        A1.airport_name as source_airport,
+        A2.airport_name as dest_airport
+"""
+MY_ORDERS_FROM_SQL = """
+    FROM Order_Table O
+    JOIN Airport A1 ON O.source_airport_id = A1.airport_id
+    JOIN Airport A2 ON O.dest_airport_id = A2.airport_id
+    WHERE O.customer_email = %s
+"""
+MY_ORDERS_ORDER_SQL = " ORDER BY O.order_date DESC, O.order_code DESC LIMIT %s"
+
+def encode_orders_cursor(order):
+    """
+    Keyset cursor of an order: its position in (order_date, order_code) order.
+    order_date is nullable (such orders come last): it is left empty in the cursor.
+    """
+    order_date = order['order_date'].strftime('%Y%m%d%H%M%S') if order['order_date'] else ''
+    return f"{order_date}-{order['order_code']}"
+
+def decode_orders_cursor(cursor):
+    try:
+        order_date, order_code = cursor.split('-')
+        return (datetime.strptime(order_date, '%Y%m%d%H%M%S') if order_date else None), int(order_code)
+    except (AttributeError, ValueError):
+        return None
+
+def orders_after_sql(position):
+    """Keyset condition and parameters for the orders after `position` (NULL dates sort last)."""
+    order_date, order_code = position
+    if order_date is None:
+        return " AND (O.order_date IS NULL AND O.order_code < %s)", [order_code]
+    return (" AND (O.order_date < %s OR (O.order_date = %s AND O.order_code < %s) OR O.order_date IS NULL)",
+            [order_date, order_date, order_code])
+
 @customer_bp.route('/my_orders')
 def my_orders():
     if session.get('role') != 'customer':
@@ -55,58 +102,43 @@ def my_orders():
     max_price = request.args.get('max_price')
     order_code_filter = request.args.get('order_code')
     seat_class_filter = request.args.get('seat_class')
+    after = request.args.get('after')
     
-    query = """
-        SELECT 
-            O.order_code, 
-            O.order_date, 
-            O.total_payment, 
-            O.order_status, 
-            O.departure_time,
-            A1.airport_name as source_airport,
-            A2.airport_name as dest_airport,
-            OS.row_number,
-            OS.column_number,
-            OS.is_business
-        FROM Order_Table O
-        JOIN Airport A1 ON O.source_airport_id = A1.airport_id
-        JOIN Airport A2 ON O.dest_airport_id = A2.airport_id
-        LEFT JOIN Order_Seats OS ON O.order_code = OS.order_code
-        WHERE O.customer_email = %s
-    """
+    # Filters shared by the page query and the totals query
+    where = MY_ORDERS_FROM_SQL
     params = [email]
     
     if status_filter:
-        query += " AND O.order_status = %s"
+        where += " AND O.order_status = %s"
         params.append(status_filter)
     
     if date_from:
-        query += " AND DATE(O.order_date) >= %s"
+        where += " AND DATE(O.order_date) >= %s"
         params.append(date_from)
     
     if date_to:
-        query += " AND DATE(O.order_date) <= %s"
+        where += " AND DATE(O.order_date) <= %s"
         params.append(date_to)
     
     if departure_from:
-        query += " AND DATE(O.departure_time) >= %s"
+        where += " AND DATE(O.departure_time) >= %s"
         params.append(departure_from)
     
     if departure_to:
-        query += " AND DATE(O.departure_time) <= %s"
+        where += " AND DATE(O.departure_time) <= %s"
         params.append(departure_to)
     
     if source_airport:
-        query += " AND A1.airport_name = %s"
+        where += " AND A1.airport_name = %s"
         params.append(source_airport)
     
     if dest_airport:
-        query += " AND A2.airport_name = %s"
+        where += " AND A2.airport_name = %s"
         params.append(dest_airport)
     
     if order_code_filter:
         try:
-            query += " AND O.order_code = %s"
+            where += " AND O.order_code = %s"
             params.append(int(order_code_filter))
         except ValueError:
             pass
@@ -114,75 +146,81 @@ def my_orders():
     if seat_class_filter:
         # Filter by seat class - need to check if order has seats of that class
         if seat_class_filter == 'business':
-            query += " AND EXISTS (SELECT 1 FROM Order_Seats OS2 WHERE OS2.order_code = O.order_code AND OS2.is_business = 1)"
+            where += " AND EXISTS (SELECT 1 FROM Order_Seats OS2 WHERE OS2.order_code = O.order_code AND OS2.is_business = 1)"
         elif seat_class_filter == 'economy':
-            query += " AND EXISTS (SELECT 1 FROM Order_Seats OS2 WHERE OS2.order_code = O.order_code AND OS2.is_business = 0)"
+            where += " AND EXISTS (SELECT 1 FROM Order_Seats OS2 WHERE OS2.order_code = O.order_code AND OS2.is_business = 0)"
     
     if min_price:
         try:
-            query += " AND O.total_payment >= %s"
+            where += " AND O.total_payment >= %s"
             params.append(float(min_price))
         except ValueError:
             pass
     
     if max_price:
         try:
-            query += " AND O.total_payment <= %s"
+            where += " AND O.total_payment <= %s"
             params.append(float(max_price))
         except ValueError:
             pass
     
-    # Default ordering: newest orders first
-    query += " ORDER BY O.order_date DESC"
+    # Total spending over all matching orders, computed by the database:
+    # - Active/Confirmed orders: full payment
+    # - Customer Cancelled: 5% cancellation fee (stored in total_payment)
+    # - System Cancelled: 0 (full refund)
+    # - Cancelled (legacy): 0
+    totals = query_db("""
+        SELECT COALESCE(SUM(CASE WHEN O.order_status IN ('Cancelled', 'System Cancelled') THEN 0
+                                 ELSE O.total_payment END), 0) as total_spending
+    """ + where, tuple(params), one=True)
+    total_spending = totals['total_spending'] if totals else 0
     
-    raw_orders = query_db(query, tuple(params))
+    # One page of orders, newest first (keyset pagination on order_date, order_code)
+    page_where = where
+    page_params = list(params)
+    position = decode_orders_cursor(after) if after else None
+    if position:
+        after_sql, after_params = orders_after_sql(position)
+        page_where += after_sql
+        page_params += after_params
     
-    # Group seats by order
-    orders_map = {}
-    total_spending = 0
+    orders = query_db(MY_ORDERS_SELECT_SQL + page_where + MY_ORDERS_ORDER_SQL,
+                      tuple(page_params) + (MY_ORDERS_PAGE_SIZE + 1,))
     
-    for row in raw_orders:
-        code = row['order_code']
-        if code not in orders_map:
-            orders_map[code] = {
-                'order_code': row['order_code'],
-                'order_date': row['order_date'],
-                'total_payment': row['total_payment'],
-                'order_status': row['order_status'],
-                'departure_time': row['departure_time'],
-                'source_airport': row['source_airport'],
-                'dest_airport': row['dest_airport'],
-                'seats': []
-            }
-            
-            # Add to total spending:
-            # - Active/Confirmed orders: full payment
-            # - Customer Cancelled: 5% cancellation fee (stored in total_payment)
-            # - System Cancelled: 0 (full refund)
-            # - Cancelled (legacy): 0
-            if row['order_status'] == 'Customer Cancelled':
-                # Customer cancelled orders have the 5% fee stored in total_payment
-                total_spending += row['total_payment']
-            elif row['order_status'] not in ['Cancelled', 'System Cancelled']:
-                # Active, Confirmed orders - full payment
-                total_spending += row['total_payment']
-        
-        if row['row_number'] is not None:
-            orders_map[code]['seats'].append({
-                'row': row['row_number'],
-                'col': row['column_number'],
-                'is_business': row['is_business']
-            })
+    next_cursor = None
+    if len(orders) > MY_ORDERS_PAGE_SIZE:
+        orders = orders[:MY_ORDERS_PAGE_SIZE]
+        next_cursor = encode_orders_cursor(orders[-1])
     
-    orders = list(orders_map.values())
+    # Seats of the page's orders, in one query for the whole page (plain rows:
+    # a GROUP_CONCAT list would be cut off at group_concat_max_len on large orders)
+    for order in orders:
+        order['seats'] = []
+    if orders:
+        orders_by_code = {order['order_code']: order for order in orders}
+        placeholders = ', '.join(['%s'] * len(orders_by_code))
+        seats = query_db(f"""
+            SELECT order_code, is_business, `row_number`, `column_number`
+            FROM Order_Seats
+            WHERE order_code IN ({placeholders})
+            ORDER BY order_code, is_business DESC, `row_number`, `column_number`
+        """, tuple(orders_by_code))
+        for s in seats:
+            orders_by_code[s['order_code']]['seats'].append({
+                'row': s['row_number'],
+                'col': s['column_number'],
+                'is_business': bool(s['is_business'])
+            })
     
     # Get airports for filter dropdown
-    airports = query_db("SELECT airport_name FROM Airport ORDER BY airport_name")
+    airports = get_all_airports()
     
     return render_template('customer/my_orders.html', 
                           orders=orders, 
                           total_spending=total_spending,
-                          airports=airports)
+                          airports=airports,
+                          next_cursor=next_cursor,
+                          is_first_page=not position)
 
 @customer_bp.route('/cancel_order/<int:order_code>', methods=['POST'])
 def cancel_order(order_code):
@@ -244,7 +282,12 @@ def cancel_order(order_code):
     refund_amount = float(order['total_payment']) - fee
     
     try:
-        execute_db("UPDATE Order_Table SET order_status = 'Customer Cancelled', total_payment = %s WHERE order_code = %s", (fee, order_code))
+        # Order status and seat inventory are updated together
+        with transaction():
+            execute_db("UPDATE Order_Table SET order_status = 'Customer Cancelled', total_payment = %s WHERE order_code = %s", (fee, order_code))
+            released = release_order_seats(order_code)
+        if released:
+            record_seats(released['flight_id'], released['inventory_version'], released['seats'], taken=False)
         flash(f'Order cancelled successfully. A 5% cancellation fee (${fee:.2f}) was deducted. Refund amount: ${refund_amount:.2f}', 'success')
     except Exception as e:
         flash(f'Error cancelling order: {e}', 'danger')
@@ -254,7 +297,6 @@ def cancel_order(order_code):
     else:
         # For guests, we need to show the updated status. 
         # Since we can't easily redirect with POST data, we re-fetch and render.
-        updated_order = query_db("SELECT * FROM Order_Table WHERE order_code = %s", (order_code,), one=True)
         # We need to join with Airport names again for the template
         query = """
             SELECT 
@@ -2,15 +2,13 @@ from flask import render_template, redirect, url_for, flash, session, request, j
 from services.flight_service import (
     get_all_airports, get_all_aircrafts, get_all_pilots, get_all_attendants,
     create_flight, cancel_flight, get_flight_details, update_flight_status, get_flights,
-    get_crew_availability, get_aircraft_availability, update_flight_statuses, add_aircraft
+    get_crew_availability, get_aircraft_availability, add_aircraft
 )
 from routes.manager import manager_bp
 from routes.manager.validators import validate_crew_count
 from datetime import datetime
-from urllib.parse import unquote
 
 @manager_bp.route('/api/check_availability')
-@update_flight_statuses
 def check_availability():
     if session.get('role') != 'manager':
         return jsonify({'error': 'Unauthorized'}), 401
@@ -151,7 +149,7 @@ def manage_flights():
             # Store hours for better messaging
             f['hours_until_flight'] = hours_until_flight
             
-            # Convert departure_time back to string for template rendering (url_for needs string)
+            # Convert departure_time back to string for template rendering
             if isinstance(f['departure_time'], datetime):
                 f['departure_time'] = f['departure_time'].strftime('%Y-%m-%d %H:%M:%S')
     except Exception as e:
@@ -163,31 +161,13 @@ def manage_flights():
     except Exception as e:
         raise
 
-@manager_bp.route('/cancel_flight/<int:source_id>/<int:dest_id>/<path:departure_time>', methods=['POST'])
-def cancel_flight_route(source_id, dest_id, departure_time):
+@manager_bp.route('/cancel_flight/<int:flight_id>', methods=['POST'])
+def cancel_flight_route(flight_id):
     if session.get('role') != 'manager':
         flash('Access denied. Managers only.', 'danger')
         return redirect(url_for('auth.login'))
 
-    # Decode URL-encoded departure_time (spaces are encoded as %20)
-    departure_time = unquote(departure_time)
-    
-    # Parse the datetime string properly
-    try:
-        # Try parsing with space separator first
-        departure_time = datetime.strptime(departure_time, '%Y-%m-%d %H:%M:%S')
-    except ValueError:
-        try:
-            # Try parsing with T separator
-            departure_time = datetime.strptime(departure_time, '%Y-%m-%dT%H:%M:%S')
-        except ValueError:
-            flash('Invalid departure time format.', 'danger')
-            return redirect(url_for('manager.manage_flights'))
-    
-    # Convert back to string format expected by the service
-    departure_time_str = departure_time.strftime('%Y-%m-%d %H:%M:%S')
-    
-    success, message = cancel_flight(source_id, dest_id, departure_time_str)
+    success, message = cancel_flight(flight_id)
     
     if success:
         flash(message, 'success')
@@ -197,13 +177,12 @@ def cancel_flight_route(source_id, dest_id, departure_time):
     return redirect(url_for('manager.manage_flights'))
 
 
-@manager_bp.route('/api/flight_details/<int:source_id>/<int:dest_id>/<departure_time>')
-@update_flight_statuses
-def api_flight_details(source_id, dest_id, departure_time):
+@manager_bp.route('/api/flight_details/<int:flight_id>')
+def api_flight_details(flight_id):
     if session.get('role') != 'manager':
         return jsonify({'error': 'Access denied'}), 403
     
-    flight = get_flight_details(source_id, dest_id, departure_time)
+    flight = get_flight_details(flight_id)
     
     if not flight:
         return jsonify({'error': 'Flight not found'}), 404
@@ -222,12 +201,10 @@ def update_status():
         return jsonify({'success': False, 'message': 'Access denied'}), 403
         
     data = request.get_json()
-    source_id = data.get('source_id')
-    dest_id = data.get('dest_id')
-    departure_time = data.get('departure_time')
+    flight_id = data.get('flight_id')
     new_status = data.get('status')
     
-    success, message = update_flight_status(source_id, dest_id, departure_time, new_status)
+    success, message = update_flight_status(flight_id, new_status)
     
     return jsonify({'success': success, 'message': message})
 
@@ -1,4 +1,5 @@
 from db import query_db
+from services import reference_cache
 from services.flight_service import get_flight_duration
 
 def validate_crew_count(crew_ids, aircraft_id, source_id, dest_id, departure_time):
@@ -10,7 +11,7 @@ def validate_crew_count(crew_ids, aircraft_id, source_id, dest_id, departure_tim
         return False, "No crew members selected."
     
     # Get aircraft type
-    aircraft = query_db("SELECT is_large FROM Aircraft WHERE aircraft_id = %s", (aircraft_id,), one=True)
+    aircraft = reference_cache.get_aircraft(aircraft_id)
     if not aircraft:
         return False, "Invalid aircraft selected."
     
@@ -29,22 +30,22 @@ def validate_crew_count(crew_ids, aircraft_id, source_id, dest_id, departure_tim
     selected_pilots = []
     selected_attendants = []
     
+    # Look up the roles of all selected crew members in one query
+    placeholders = ', '.join(['%s'] * len(crew_ids))
+    crew_roles = query_db(f"""
+        SELECT id_number, is_pilot FROM Flight_Crew 
+        WHERE id_number IN ({placeholders})
+    """, tuple(crew_ids))
+    is_pilot_by_id = {c['id_number']: c['is_pilot'] for c in crew_roles}
+    
     for crew_id in crew_ids:
         # Check if it's a pilot or attendant
-        pilot_check = query_db("""
-            SELECT id_number FROM Flight_Crew 
-            WHERE id_number = %s AND is_pilot = 1
-        """, (crew_id,), one=True)
-        
-        if pilot_check:
+        if crew_id not in is_pilot_by_id:
+            continue
+        if is_pilot_by_id[crew_id]:
             selected_pilots.append(crew_id)
         else:
-            attendant_check = query_db("""
-                SELECT id_number FROM Flight_Crew 
-                WHERE id_number = %s AND is_pilot = 0
-            """, (crew_id,), one=True)
-            if attendant_check:
-                selected_attendants.append(crew_id)
+            selected_attendants.append(crew_id)
     
     # Validate counts
     pilot_count = len(selected_pilots)
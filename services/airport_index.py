@@ -0,0 +1,75 @@
+import bisect
+import re
+import unicodedata
+
+# Matching is case- and accent-insensitive: "sao" finds "São Paulo"
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class AirportNameIndex:
+    """
+    In-memory search index over airport names: a sorted list of name and word
+    prefixes for autocomplete, plus a trigram index for substring matches.
+    Built from the reference cache's airport rows and rebuilt with them.
+    """
+
+    def __init__(self, airports):
+        self._names = {}     # airport_id -> airport_name
+        self._folded = {}    # airport_id -> folded airport_name
+        self._tokens = []    # sorted (token, rank, airport_id); rank 0 = whole name, 1 = word
+        self._trigrams = {}  # trigram -> {airport_id}
+
+        for airport in airports:
+            airport_id = airport['airport_id']
+            folded = fold(airport['airport_name'])
+            self._names[airport_id] = airport['airport_name']
+            self._folded[airport_id] = folded
+            self._tokens.append((folded, 0, airport_id))
+            for word in set(re.findall(r'\w+', folded)):
+                if word != folded:
+                    self._tokens.append((word, 1, airport_id))
+            for trigram in _trigrams(folded):
+                self._trigrams.setdefault(trigram, set()).add(airport_id)
+        self._tokens.sort()
+
+    def _substring_ids(self, query):
+        if len(query) < 3:
+            # Too short for trigrams: the airport list is small enough to scan
+            candidates = self._folded.keys()
+        else:
+            sets = sorted((self._trigrams.get(t, set()) for t in _trigrams(query)), key=len)
+            candidates = set.intersection(*sets) if sets else set()
+        return [airport_id for airport_id in candidates if query in self._folded[airport_id]]
+
+    def matching_ids(self, text):
+        """Ids of the airports whose name contains `text`."""
+        query = fold(text).strip()
+        if not query:
+            return []
+        return sorted(self._substring_ids(query))
+
+    def search(self, text, limit=10):
+        """
+        Autocomplete: [{'airport_id', 'airport_name'}] ranked by whole-name prefix,
+        then word prefix, then any substring match; alphabetical within a rank.
+        """
+        query = fold(text).strip()
+        if not query:
+            return []
+
+        ranks = {}
+        i = bisect.bisect_left(self._tokens, (query,))
+        while i < len(self._tokens) and self._tokens[i][0].startswith(query):
+            _, rank, airport_id = self._tokens[i]
+            ranks[airport_id] = min(rank, ranks.get(airport_id, rank))
+            i += 1
+        for airport_id in self._substring_ids(query):
+            ranks.setdefault(airport_id, 2)
+
+        ranked = sorted(ranks, key=lambda airport_id: (ranks[airport_id], self._folded[airport_id]))
+        return [{'airport_id': airport_id, 'airport_name': self._names[airport_id]}
+                for airport_id in ranked[:limit]]
@@ -0,0 +1,163 @@
+import bisect
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+import db
+from services import reference_cache
+
+# Process-local departure lists for connecting-itinerary search, loaded in one
+# query and reloaded after CONNECTION_INDEX_MAX_AGE seconds (flight changes made
+# by this process invalidate it right away; seat counts may lag until reload,
+# booking re-checks them).
+CONNECTION_INDEX_MAX_AGE = int(os.getenv('CONNECTION_INDEX_MAX_AGE', '60'))
+
+MIN_LAYOVER = timedelta(minutes=int(os.getenv('CONNECTION_MIN_LAYOVER_MINUTES', '45')))
+MAX_LAYOVER = timedelta(minutes=int(os.getenv('CONNECTION_MAX_LAYOVER_MINUTES', '720')))
+MAX_LEGS = int(os.getenv('CONNECTION_MAX_LEGS', '3'))
+MAX_ITINERARIES = 10
+
+class ConnectionIndex:
+    """Active future flights grouped by source airport, sorted by departure time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._departures = {}  # source_airport_id -> [(departure_time, leg)]
+        self._times = {}       # source_airport_id -> [departure_time] (bisect keys)
+
+    def _load(self):
+        flights = db.query_db("""
+            SELECT source_airport_id, dest_airport_id, departure_time,
+                   economy_price, business_price, economy_seats_left, business_seats_left
+            FROM Flight
+            WHERE flight_status = 'Active' AND departure_time > NOW()
+            ORDER BY source_airport_id, departure_time
+        """)
+        departures = {}
+        for f in flights:
+            duration = reference_cache.get_route_duration(f['source_airport_id'], f['dest_airport_id'])
+            leg = dict(f)
+            leg['flight_duration'] = duration
+            leg['arrival_time'] = f['departure_time'] + timedelta(minutes=duration)
+            departures.setdefault(f['source_airport_id'], []).append((f['departure_time'], leg))
+        self._departures = departures
+        self._times = {airport_id: [t for t, _ in legs] for airport_id, legs in departures.items()}
+        self._loaded_at = time.monotonic()
+
+    def snapshot(self):
+        """Returns the (departures, times) maps, reloading them if they are too old."""
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > CONNECTION_INDEX_MAX_AGE:
+                self._load()
+            return self._departures, self._times
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+_index = ConnectionIndex()
+
+def get_connection_index():
+    return _index
+
+def _departures_between(departures, times, airport_id, earliest, latest):
+    legs = departures.get(airport_id)
+    if not legs:
+        return []
+    keys = times[airport_id]
+    start = bisect.bisect_left(keys, earliest)
+    end = bisect.bisect_right(keys, latest)
+    return [leg for _, leg in legs[start:end]]
+
+def find_connections(source_ids, dest_ids, search_date=None, flight_class=None,
+                     min_price=None, max_price=None, max_legs=MAX_LEGS, limit=MAX_ITINERARIES):
+    """
+    Itineraries of 2 to `max_legs` flights from any of `source_ids` to any of `dest_ids`,
+    first leg departing on `search_date` (any future date if None). Consecutive legs
+    must leave between MIN_LAYOVER and MAX_LAYOVER after the previous arrival.
+
+    Depth-first over the time-expanded graph: each hop is a bisect into the next
+    airport's departure list, airports are never revisited, and branches that cannot
+    beat the `limit` best arrivals found so far or exceed max_price are cut.
+    Returns itineraries sorted by arrival time, then price.
+    """
+    departures, times = get_connection_index().snapshot()
+    dest_ids = set(dest_ids)
+    business = flight_class == 'Business'
+    price_key = 'business_price' if business else 'economy_price'
+    seats_key = 'business_seats_left' if business else 'economy_seats_left'
+    # Price bounds come straight from the query string: invalid values are ignored
+    try:
+        max_price = float(max_price) if max_price else None
+    except ValueError:
+        max_price = None
+    try:
+        min_price = float(min_price) if min_price else None
+    except ValueError:
+        min_price = None
+
+    if search_date:
+        try:
+            day = datetime.strptime(search_date, '%Y-%m-%d')
+        except ValueError:
+            return []
+        first_window = (day, day + timedelta(days=1) - timedelta(microseconds=1))
+    else:
+        first_window = (datetime.min, datetime.max)
+
+    results = []  # (arrival_time, price, legs)
+
+    def worst_arrival():
+        return results[-1][0] if len(results) >= limit else None
+
+    def extend(legs, visited, price):
+        last = legs[-1]
+        bound = worst_arrival()
+        if bound is not None and last['arrival_time'] > bound:
+            return
+        if last['dest_airport_id'] in dest_ids:
+            if len(legs) > 1 and (min_price is None or price >= min_price):
+                results.append((last['arrival_time'], price, list(legs)))
+                results.sort(key=lambda r: (r[0], r[1]))
+                del results[limit:]
+            return
+        if len(legs) == max_legs:
+            return
+        for leg in _departures_between(departures, times, last['dest_airport_id'],
+                                       last['arrival_time'] + MIN_LAYOVER,
+                                       last['arrival_time'] + MAX_LAYOVER):
+            if leg['dest_airport_id'] in visited or leg[seats_key] <= 0:
+                continue
+            leg_price = price + float(leg[price_key] or 0)
+            if max_price is not None and leg_price > max_price:
+                continue
+            legs.append(leg)
+            visited.add(leg['dest_airport_id'])
+            extend(legs, visited, leg_price)
+            visited.discard(leg['dest_airport_id'])
+            legs.pop()
+
+    for source_id in source_ids:
+        for leg in _departures_between(departures, times, source_id, *first_window):
+            # Direct flights are the regular search's job
+            if leg['dest_airport_id'] in dest_ids or leg[seats_key] <= 0:
+                continue
+            price = float(leg[price_key] or 0)
+            if max_price is not None and price > max_price:
+                continue
+            extend([leg], {source_id, leg['dest_airport_id']}, price)
+
+    itineraries = []
+    for arrival_time, price, legs in results:
+        itineraries.append({
+            'legs': [dict(leg,
+                          source_airport=reference_cache.get_airport_name(leg['source_airport_id']),
+                          dest_airport=reference_cache.get_airport_name(leg['dest_airport_id']))
+                     for leg in legs],
+            'departure_time': legs[0]['departure_time'],
+            'arrival_time': arrival_time,
+            'total_price': price,
+            'total_duration': int((arrival_time - legs[0]['departure_time']).total_seconds() // 60)
+        })
+    return itineraries
@@ -1,4 +1,5 @@
-from db import execute_db, query_db
+from db import execute_db, query_db, transaction
+from services import reference_cache
 
 def add_new_staff(id_number, first_name, middle_name, last_name, city, street, house_number, phone, start_work_date, role, trained_for_long_flights):
     try:
@@ -9,18 +10,21 @@ def add_new_staff(id_number, first_name, middle_name, last_name, city, street, h
 
         is_pilot = 1 if role == 'pilot' else 0
         
-        # Insert into Employee table
-        execute_db('''
-            INSERT INTO Employee (id_number, first_name, middle_name, last_name, city, street, house_number, phone, start_work_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ''', (id_number, first_name, middle_name, last_name, city, street, house_number, phone, start_work_date))
+        # Employee and Flight_Crew rows are committed together
+        with transaction():
+            # Insert into Employee table
+            execute_db('''
+                INSERT INTO Employee (id_number, first_name, middle_name, last_name, city, street, house_number, phone, start_work_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ''', (id_number, first_name, middle_name, last_name, city, street, house_number, phone, start_work_date))
 
-        # Insert into Flight_Crew table
-        execute_db('''
-            INSERT INTO Flight_Crew (id_number, trained_for_long_flights, is_pilot)
-            VALUES (%s, %s, %s)
-        ''', (id_number, trained_for_long_flights, is_pilot))
+            # Insert into Flight_Crew table
+            execute_db('''
+                INSERT INTO Flight_Crew (id_number, trained_for_long_flights, is_pilot)
+                VALUES (%s, %s, %s)
+            ''', (id_number, trained_for_long_flights, is_pilot))
 
+        reference_cache.invalidate('pilots', 'attendants')
         return True, 'Staff member added successfully!'
 
     except Exception as e:
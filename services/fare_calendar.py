@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+import db
+from services.schedule_index import parse_departure_time
+
+# Process-local lowest-fare calendar: (source_id, dest_id) -> {day: fares}.
+# Built from one aggregate query, updated in place when this process creates or
+# cancels a flight, and rebuilt after FARE_CALENDAR_MAX_AGE seconds to pick up
+# changes made by other processes.
+FARE_CALENDAR_MAX_AGE = int(os.getenv('FARE_CALENDAR_MAX_AGE', '300'))
+
+_DAY_FARES_SQL = """
+    SELECT source_airport_id, dest_airport_id, DATE(departure_time) as day,
+           MIN(economy_price) as economy, MIN(business_price) as business, COUNT(*) as flights
+    FROM Flight
+    WHERE flight_status = 'Active' AND departure_time > NOW()
+"""
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+def _min_fare(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+class FareCalendar:
+    """Cheapest active fares per route and departure day."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._routes = {}  # (source_id, dest_id) -> {date: {'economy', 'business', 'flights'}}
+
+    def _entry(self, row):
+        return {'economy': _to_float(row['economy']), 'business': _to_float(row['business']),
+                'flights': row['flights']}
+
+    def _load(self):
+        routes = {}
+        for row in db.query_db(_DAY_FARES_SQL + " GROUP BY source_airport_id, dest_airport_id, day"):
+            routes.setdefault((row['source_airport_id'], row['dest_airport_id']), {})[row['day']] = self._entry(row)
+        self._routes = routes
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > FARE_CALENDAR_MAX_AGE:
+            self._load()
+
+    def month(self, route_pairs, year, month):
+        """
+        Cheapest fares per day of a month over the given (source_id, dest_id) pairs,
+        as a list of {'date', 'economy', 'business', 'flights'} for days with flights.
+        """
+        first = date(year, month, 1)
+        next_month = date(year + month // 12, month % 12 + 1, 1)
+        today = date.today()
+        days = {}
+        with self._lock:
+            self._ensure_loaded()
+            for pair in route_pairs:
+                for day, fares in self._routes.get(pair, {}).items():
+                    if not (first <= day < next_month) or day < today:
+                        continue
+                    merged = days.setdefault(day, {'economy': None, 'business': None, 'flights': 0})
+                    merged['economy'] = _min_fare(merged['economy'], fares['economy'])
+                    merged['business'] = _min_fare(merged['business'], fares['business'])
+                    merged['flights'] += fares['flights']
+        return [dict(fares, date=day.isoformat()) for day, fares in sorted(days.items())]
+
+    def record_flight(self, source_id, dest_id, departure_time, economy_price, business_price):
+        """Folds a newly created flight into its day."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            try:
+                day = parse_departure_time(departure_time).date()
+                economy, business = _to_float(economy_price), _to_float(business_price)
+            except (TypeError, ValueError):
+                self._loaded_at = None
+                return
+            fares = self._routes.setdefault((int(source_id), int(dest_id)), {}).setdefault(
+                day, {'economy': None, 'business': None, 'flights': 0})
+            fares['economy'] = _min_fare(fares['economy'], economy)
+            fares['business'] = _min_fare(fares['business'], business)
+            fares['flights'] += 1
+
+    def refresh_day(self, source_id, dest_id, departure_time):
+        """
+        Recomputes the day of a flight whose status changed: removing a flight
+        can raise the day's minimum, so the day is re-aggregated (one indexed query).
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            try:
+                key = (int(source_id), int(dest_id))
+                day = parse_departure_time(departure_time).date()
+            except (TypeError, ValueError):
+                self._loaded_at = None
+                return
+            day_start = datetime.combine(day, datetime.min.time())
+            row = db.query_db(_DAY_FARES_SQL + """
+                AND source_airport_id = %s AND dest_airport_id = %s
+                AND departure_time >= %s AND departure_time < %s
+                GROUP BY source_airport_id, dest_airport_id, day
+            """, (key[0], key[1], day_start, day_start + timedelta(days=1)), one=True)
+            days = self._routes.setdefault(key, {})
+            if row:
+                days[day] = self._entry(row)
+            else:
+                days.pop(day, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+_calendar = FareCalendar()
+
+def get_fare_calendar():
+    return _calendar
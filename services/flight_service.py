@@ -1,67 +1,97 @@
 import db
 from datetime import datetime, timedelta
-from functools import wraps
+from services import reference_cache, seat_inventory
+from services.connection_search import get_connection_index
+from services.fare_calendar import get_fare_calendar
+from services.schedule_index import SCHEDULE_INDEX_ENABLED, get_schedule_index, parse_departure_time
+
+# Effective flight status computed on read: departed 'Active' flights are reported
+# as 'Completed' even before the status sweeper has updated the row
+EFFECTIVE_STATUS_SQL = "CASE WHEN F.flight_status = 'Active' AND F.departure_time < NOW() THEN 'Completed' ELSE F.flight_status END"
 
 def update_all_flight_statuses():
     """
     Updates flight statuses based on current time and departure time.
     Flights that have already departed (departure_time < NOW()) and are still 'Active'
     will be updated to 'Completed'.
-    This function should be called before any flight-related queries to ensure
-    flight statuses are always up-to-date.
+    Called periodically by the background status sweeper (services/status_sweeper.py),
+    not on every request.
     """
-    try:
-        db.execute_db("""
-            UPDATE Flight 
-            SET flight_status = 'Completed'
-            WHERE flight_status = 'Active' 
-            AND departure_time < NOW()
-        """)
-    except Exception as e:
-        # Error updating flight_statuses - fail silently
-        pass
+    db.execute_db("""
+        UPDATE Flight 
+        SET flight_status = 'Completed'
+        WHERE flight_status = 'Active' 
+        AND departure_time < NOW()
+    """)
 
-def update_flight_statuses(func):
-    """
-    Decorator that calls update_all_flight_statuses() before executing the wrapped function.
-    Works with both route handlers and service functions.
-    """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        update_all_flight_statuses()
-        return func(*args, **kwargs)
-    return wrapper
+# Lookup tables are served from the reference-data cache (services/reference_cache.py)
 
 def get_all_airports():
-    return db.query_db("SELECT * FROM Airport ORDER BY airport_name")
+    return reference_cache.get_rows('airports')
 
 def get_all_aircrafts():
-    return db.query_db("SELECT * FROM Aircraft ORDER BY aircraft_id")
+    return reference_cache.get_rows('aircrafts')
 
 def get_all_pilots():
-    return db.query_db("""
-        SELECT E.id_number, E.first_name, E.last_name, FC.trained_for_long_flights
-        FROM Employee E 
-        JOIN Flight_Crew FC ON E.id_number = FC.id_number 
-        WHERE FC.is_pilot = 1
-    """)
+    return reference_cache.get_rows('pilots')
 
 def get_all_attendants():
-    return db.query_db("""
-        SELECT E.id_number, E.first_name, E.last_name, FC.trained_for_long_flights
-        FROM Employee E 
-        JOIN Flight_Crew FC ON E.id_number = FC.id_number 
-        WHERE FC.is_pilot = 0
-    """)
+    return reference_cache.get_rows('attendants')
 
 def get_flight_duration(source_id, dest_id):
-    result = db.query_db("""
-        SELECT flight_duration FROM Flight_Route 
-        WHERE source_airport_id = %s AND dest_airport_id = %s
-    """, (source_id, dest_id), one=True)
-    return result['flight_duration'] if result else 0
+    return reference_cache.get_route_duration(source_id, dest_id)
+
+# Last active flight of each aircraft departing before %s (idx_flight_aircraft)
+PREVIOUS_AIRCRAFT_FLIGHTS_SQL = """
+    SELECT aircraft_id, dest_airport_id, departure_time, flight_duration, airport_name
+    FROM (
+        SELECT F.aircraft_id, F.dest_airport_id, F.departure_time,
+               COALESCE(FR.flight_duration, 0) as flight_duration, A.airport_name,
+               ROW_NUMBER() OVER (PARTITION BY F.aircraft_id ORDER BY F.departure_time DESC) as rn
+        FROM Flight F
+        LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id 
+            AND F.dest_airport_id = FR.dest_airport_id
+        JOIN Airport A ON F.dest_airport_id = A.airport_id
+        WHERE F.aircraft_id IS NOT NULL
+            AND F.departure_time < %s
+            AND F.flight_status = 'Active'
+            AND F.departure_time >= NOW()
+    ) P
+    WHERE P.rn = 1
+"""
+
+def get_previous_aircraft_flights(departure_time):
+    """
+    Returns {aircraft_id: last active flight departing before departure_time}
+    for the whole fleet in a single query (window function per aircraft).
+    """
+    rows = db.query_db(PREVIOUS_AIRCRAFT_FLIGHTS_SQL, (departure_time,))
+    return {row['aircraft_id']: row for row in rows}
+
+# First active flight of each aircraft departing at or after %s (idx_flight_aircraft)
+NEXT_AIRCRAFT_FLIGHTS_SQL = """
+    SELECT aircraft_id, source_airport_id, departure_time, airport_name
+    FROM (
+        SELECT F.aircraft_id, F.source_airport_id, F.departure_time, A.airport_name,
+               ROW_NUMBER() OVER (PARTITION BY F.aircraft_id ORDER BY F.departure_time ASC) as rn
+        FROM Flight F
+        JOIN Airport A ON F.source_airport_id = A.airport_id
+        WHERE F.aircraft_id IS NOT NULL
+            AND F.departure_time >= %s
+            AND F.flight_status = 'Active'
+            AND F.departure_time >= NOW()
+    ) N
+    WHERE N.rn = 1
+"""
+
+def get_next_aircraft_flights(departure_time):
+    """
+    Returns {aircraft_id: first active flight departing at or after departure_time}
+    for the whole fleet in a single query (window function per aircraft).
+    """
+    rows = db.query_db(NEXT_AIRCRAFT_FLIGHTS_SQL, (departure_time,))
+    return {row['aircraft_id']: row for row in rows}
 
-@update_flight_statuses
 def get_aircraft_availability(source_id, dest_id, departure_time_str):
     # Convert string to datetime if needed
     if isinstance(departure_time_str, str):
@@ -80,12 +110,18 @@ def get_aircraft_availability(source_id, dest_id, departure_time_str):
     is_long_flight = duration > 360 # 6 hours
 
     # Get airport names
-    source_airport = db.query_db("SELECT airport_name FROM Airport WHERE airport_id = %s", (source_id,), one=True)
-    dest_airport = db.query_db("SELECT airport_name FROM Airport WHERE airport_id = %s", (dest_id,), one=True)
-    source_name = source_airport['airport_name'] if source_airport else "Unknown"
-    dest_name = dest_airport['airport_name'] if dest_airport else "Unknown"
+    source_name = reference_cache.get_airport_name(source_id)
+    dest_name = reference_cache.get_airport_name(dest_id)
 
     aircrafts = get_all_aircrafts()
+
+    # Neighbouring flights of the whole fleet, from the in-memory schedule index
+    # or from two set-based queries
+    if SCHEDULE_INDEX_ENABLED:
+        prev_flights, next_flights = get_schedule_index().aircraft_neighbours(departure_time)
+    else:
+        prev_flights = get_previous_aircraft_flights(departure_time)
+        next_flights = get_next_aircraft_flights(departure_time)
     
     for aircraft in aircrafts:
         aircraft['is_available'] = True
@@ -98,18 +134,7 @@ def get_aircraft_availability(source_id, dest_id, departure_time_str):
             continue
 
         # Check Previous Flight
-        prev_flight = db.query_db("""
-            SELECT F.dest_airport_id, F.departure_time, COALESCE(FR.flight_duration, 0) as flight_duration, A.airport_name
-            FROM Flight F
-            LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id 
-                AND F.dest_airport_id = FR.dest_airport_id
-            JOIN Airport A ON F.dest_airport_id = A.airport_id
-            WHERE F.aircraft_id = %s 
-                AND F.departure_time < %s
-                AND F.flight_status = 'Active'
-            ORDER BY F.departure_time DESC
-            LIMIT 1
-        """, (aircraft['aircraft_id'], departure_time), one=True)
+        prev_flight = prev_flights.get(aircraft['aircraft_id'])
 
         if prev_flight:
             prev_arrival = prev_flight['departure_time'] + timedelta(minutes=prev_flight['flight_duration'])
@@ -122,16 +147,7 @@ def get_aircraft_availability(source_id, dest_id, departure_time_str):
         
         # Check Next Flight
         if aircraft['is_available']:
-            next_flight = db.query_db("""
-                SELECT F.source_airport_id, F.departure_time, A.airport_name
-                FROM Flight F
-                JOIN Airport A ON F.source_airport_id = A.airport_id
-                WHERE F.aircraft_id = %s
-                    AND F.departure_time >= %s
-                    AND F.flight_status = 'Active'
-                ORDER BY F.departure_time ASC
-                LIMIT 1
-            """, (aircraft['aircraft_id'], departure_time), one=True)
+            next_flight = next_flights.get(aircraft['aircraft_id'])
 
             if next_flight:
                 if arrival_time > next_flight['departure_time']:
@@ -143,7 +159,53 @@ def get_aircraft_availability(source_id, dest_id, departure_time_str):
 
     return aircrafts
 
-@update_flight_statuses
+# Last assignment of each employee departing before %s (idx_assignment_employee)
+PREVIOUS_CREW_FLIGHTS_SQL = """
+    SELECT employee_id, dest_airport_id, departure_time, flight_duration, airport_name
+    FROM (
+        SELECT EFA.employee_id, F.dest_airport_id, EFA.departure_time,
+               COALESCE(FR.flight_duration, 0) as flight_duration, A.airport_name,
+               ROW_NUMBER() OVER (PARTITION BY EFA.employee_id ORDER BY EFA.departure_time DESC) as rn
+        FROM Employee_Flight_Assignment EFA
+        JOIN Flight F ON EFA.flight_id = F.flight_id
+        LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id 
+            AND F.dest_airport_id = FR.dest_airport_id
+        JOIN Airport A ON F.dest_airport_id = A.airport_id
+        WHERE EFA.departure_time < %s
+    ) P
+    WHERE P.rn = 1
+"""
+
+def get_previous_crew_flights(departure_time):
+    """
+    Returns {employee_id: last assigned flight departing before departure_time}
+    for the whole roster in a single query (window function per employee).
+    """
+    rows = db.query_db(PREVIOUS_CREW_FLIGHTS_SQL, (departure_time,))
+    return {row['employee_id']: row for row in rows}
+
+# First assignment of each employee departing at or after %s (idx_assignment_employee)
+NEXT_CREW_FLIGHTS_SQL = """
+    SELECT employee_id, source_airport_id, departure_time, airport_name
+    FROM (
+        SELECT EFA.employee_id, F.source_airport_id, EFA.departure_time, A.airport_name,
+               ROW_NUMBER() OVER (PARTITION BY EFA.employee_id ORDER BY EFA.departure_time ASC) as rn
+        FROM Employee_Flight_Assignment EFA
+        JOIN Flight F ON EFA.flight_id = F.flight_id
+        JOIN Airport A ON F.source_airport_id = A.airport_id
+        WHERE EFA.departure_time >= %s
+    ) N
+    WHERE N.rn = 1
+"""
+
+def get_next_crew_flights(departure_time):
+    """
+    Returns {employee_id: first assigned flight departing at or after departure_time}
+    for the whole roster in a single query (window function per employee).
+    """
+    rows = db.query_db(NEXT_CREW_FLIGHTS_SQL, (departure_time,))
+    return {row['employee_id']: row for row in rows}
+
 def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=None):
     # Convert string to datetime if needed
     if isinstance(departure_time_str, str):
@@ -166,7 +228,7 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
     requirements = {'pilots': 2, 'attendants': 3} # Default / Small
     
     if aircraft_id:
-        aircraft = db.query_db("SELECT is_large FROM Aircraft WHERE aircraft_id = %s", (aircraft_id,), one=True)
+        aircraft = reference_cache.get_aircraft(aircraft_id)
         if aircraft:
             if aircraft['is_large']:
                 requirements = {'pilots': 3, 'attendants': 6}
@@ -178,10 +240,8 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
                     pass
 
     # Get airport names for better messages
-    source_airport = db.query_db("SELECT airport_name FROM Airport WHERE airport_id = %s", (source_id,), one=True)
-    dest_airport = db.query_db("SELECT airport_name FROM Airport WHERE airport_id = %s", (dest_id,), one=True)
-    source_name = source_airport['airport_name'] if source_airport else "Unknown"
-    dest_name = dest_airport['airport_name'] if dest_airport else "Unknown"
+    source_name = reference_cache.get_airport_name(source_id)
+    dest_name = reference_cache.get_airport_name(dest_id)
 
     # Get all crew
     pilots = get_all_pilots()
@@ -195,6 +255,14 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
         a['role'] = 'Attendant'
         all_crew.append(a)
 
+    # Neighbouring assignments of the whole roster, from the in-memory schedule index
+    # or from two set-based queries
+    if SCHEDULE_INDEX_ENABLED:
+        prev_flights, next_flights = get_schedule_index().crew_neighbours(departure_time)
+    else:
+        prev_flights = get_previous_crew_flights(departure_time)
+        next_flights = get_next_crew_flights(departure_time)
+
     for crew in all_crew:
         crew['is_available'] = True
         crew['reason'] = ""
@@ -206,20 +274,7 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
             continue
 
         # Check Previous Flight
-        prev_flight = db.query_db("""
-            SELECT F.dest_airport_id, F.departure_time, COALESCE(FR.flight_duration, 0) as flight_duration, A.airport_name
-            FROM Employee_Flight_Assignment EFA
-            JOIN Flight F ON EFA.source_airport_id = F.source_airport_id 
-                AND EFA.dest_airport_id = F.dest_airport_id 
-                AND EFA.departure_time = F.departure_time
-            LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id 
-                AND F.dest_airport_id = FR.dest_airport_id
-            JOIN Airport A ON F.dest_airport_id = A.airport_id
-            WHERE EFA.employee_id = %s 
-                AND F.departure_time < %s
-            ORDER BY F.departure_time DESC
-            LIMIT 1
-        """, (crew['id_number'], departure_time), one=True)
+        prev_flight = prev_flights.get(crew['id_number'])
 
         if prev_flight:
             prev_arrival = prev_flight['departure_time'] + timedelta(minutes=prev_flight['flight_duration'])
@@ -232,18 +287,7 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
         
         # Check Next Flight
         if crew['is_available']:
-            next_flight = db.query_db("""
-                SELECT F.source_airport_id, F.departure_time, A.airport_name
-                FROM Employee_Flight_Assignment EFA
-                JOIN Flight F ON EFA.source_airport_id = F.source_airport_id 
-                    AND EFA.dest_airport_id = F.dest_airport_id 
-                    AND EFA.departure_time = F.departure_time
-                JOIN Airport A ON F.source_airport_id = A.airport_id
-                WHERE EFA.employee_id = %s
-                    AND F.departure_time >= %s
-                ORDER BY F.departure_time ASC
-                LIMIT 1
-            """, (crew['id_number'], departure_time), one=True)
+            next_flight = next_flights.get(crew['id_number'])
 
             if next_flight:
                 if arrival_time > next_flight['departure_time']:
@@ -256,30 +300,100 @@ def get_crew_availability(source_id, dest_id, departure_time_str, aircraft_id=No
     return {'crew': all_crew, 'requirements': requirements}
 
 
+# Active flights of an aircraft overlapping [departure, arrival)
+AIRCRAFT_CONFLICTS_SQL = """
+    SELECT F.departure_time
+    FROM Flight F
+    LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id
+        AND F.dest_airport_id = FR.dest_airport_id
+    WHERE F.aircraft_id = %s
+      AND F.flight_status = 'Active'
+      AND F.departure_time < %s
+      AND F.departure_time + INTERVAL COALESCE(FR.flight_duration, 0) MINUTE > %s
+    FOR UPDATE OF F
+"""
+
+# Assignments of the given employees overlapping [departure, arrival)
+CREW_CONFLICTS_SQL = """
+    SELECT DISTINCT EFA.employee_id
+    FROM Employee_Flight_Assignment EFA
+    JOIN Flight F ON EFA.flight_id = F.flight_id
+    LEFT JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id
+        AND F.dest_airport_id = FR.dest_airport_id
+    WHERE EFA.employee_id IN ({placeholders})
+      AND F.departure_time < %s
+      AND F.departure_time + INTERVAL COALESCE(FR.flight_duration, 0) MINUTE > %s
+    FOR UPDATE OF F
+"""
+
+def check_schedule_conflicts(source_id, dest_id, departure_time, aircraft_id, crew_ids):
+    """
+    Re-checks the aircraft and crew of a new flight against the database. Must run
+    inside the create_flight transaction: the availability pages read the per-process
+    schedule index, which can miss flights created by other processes.
+    The aircraft and crew rows are locked first, so concurrent creations sharing an
+    aircraft or an employee run one after the other, and the conflict reads are
+    locking (current) reads that see every committed flight.
+    Raises ValueError on a conflict.
+    """
+    start = parse_departure_time(departure_time)
+    end = start + timedelta(minutes=get_flight_duration(source_id, dest_id))
+    placeholders = ', '.join(['%s'] * len(crew_ids))
+
+    db.query_db("SELECT aircraft_id FROM Aircraft WHERE aircraft_id = %s FOR UPDATE", (aircraft_id,))
+    if crew_ids:
+        db.query_db(f"SELECT id_number FROM Flight_Crew WHERE id_number IN ({placeholders}) FOR UPDATE",
+                    tuple(crew_ids))
+
+    busy = db.query_db(AIRCRAFT_CONFLICTS_SQL, (aircraft_id, end, start))
+    if busy:
+        raise ValueError(f"Aircraft {aircraft_id} is already scheduled on a flight departing at "
+                         f"{busy[0]['departure_time'].strftime('%Y-%m-%d %H:%M')}")
+    if crew_ids:
+        busy_crew = db.query_db(CREW_CONFLICTS_SQL.format(placeholders=placeholders),
+                                tuple(crew_ids) + (end, start))
+        if busy_crew:
+            raise ValueError("Crew already assigned to an overlapping flight: "
+                             + ", ".join(row['employee_id'] for row in busy_crew))
+
 def create_flight(source_id, dest_id, departure_time, aircraft_id, economy_price, business_price, crew_ids):
     try:
-        # 1. Create Flight
-        db.execute_db("""
-            INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, flight_status, aircraft_id, economy_price, business_price)
-            VALUES (%s, %s, %s, 'Active', %s, %s, %s)
-        """, (source_id, dest_id, departure_time, aircraft_id, economy_price, business_price))
-
-        # 2. Assign Crew
-        for emp_id in crew_ids:
-            db.execute_db("""
-                INSERT INTO Employee_Flight_Assignment (employee_id, source_airport_id, dest_airport_id, departure_time)
-                VALUES (%s, %s, %s, %s)
-            """, (emp_id, source_id, dest_id, departure_time))
+        # Flight and crew assignments are committed together
+        with db.transaction():
+            # 0. The availability shown to the manager may be stale: re-check it under lock
+            check_schedule_conflicts(source_id, dest_id, departure_time, aircraft_id, crew_ids)
+
+            # 1. Create Flight
+            # (seat counters start at the aircraft's cabin capacity)
+            flight_id = db.execute_db("""
+                INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, flight_status, aircraft_id, economy_price, business_price,
+                                    economy_seats_left, business_seats_left)
+                SELECT %s, %s, %s, 'Active', %s, %s, %s,
+                       COALESCE(SUM(CASE WHEN is_business = 0 THEN num_rows * num_columns END), 0),
+                       COALESCE(SUM(CASE WHEN is_business = 1 THEN num_rows * num_columns END), 0)
+                FROM Aircraft_Class
+                WHERE aircraft_id = %s
+            """, (source_id, dest_id, departure_time, aircraft_id, economy_price, business_price, aircraft_id))
+
+            # 2. Assign Crew (one batched insert for the whole crew)
+            db.execute_many_db("""
+                INSERT INTO Employee_Flight_Assignment (employee_id, flight_id, source_airport_id, dest_airport_id, departure_time)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(emp_id, flight_id, source_id, dest_id, departure_time) for emp_id in crew_ids])
             
+        get_schedule_index().record_flight(source_id, dest_id, departure_time, aircraft_id, crew_ids)
+        get_connection_index().invalidate()
+        get_fare_calendar().record_flight(source_id, dest_id, departure_time, economy_price, business_price)
         return True, "Flight created successfully"
     except Exception as e:
         return False, str(e)
 
-@update_flight_statuses
 def get_flights(status=None, source_id=None, dest_id=None, date_from=None, date_to=None):
     
-    query = """
-        SELECT F.*, A1.airport_name as source, A2.airport_name as dest 
+    query = f"""
+        SELECT F.flight_id, F.source_airport_id, F.dest_airport_id, F.departure_time, F.aircraft_id,
+               F.economy_price, F.business_price, {EFFECTIVE_STATUS_SQL} as flight_status,
+               A1.airport_name as source, A2.airport_name as dest 
         FROM Flight F
         JOIN Airport A1 ON F.source_airport_id = A1.airport_id
         JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
@@ -292,10 +406,9 @@ def get_flights(status=None, source_id=None, dest_id=None, date_from=None, date_
         status = status.strip() if isinstance(status, str) else str(status).strip()
     
     if status and status != 'All' and status != '':
-        query += " AND F.flight_status = %s"
+        query += f" AND {EFFECTIVE_STATUS_SQL} = %s"
         params.append(status)
         # For Active status, ensure we only get flights with future departure times
-        # (update_all_flight_statuses should handle this, but this is a safety check)
         if status == 'Active':
             query += " AND F.departure_time > NOW()"
     
@@ -321,7 +434,6 @@ def get_flights(status=None, source_id=None, dest_id=None, date_from=None, date_
     
     return results
 
-@update_flight_statuses
 def get_active_flights():
     return db.query_db("""
         SELECT F.*, A1.airport_name as source, A2.airport_name as dest 
@@ -332,14 +444,111 @@ def get_active_flights():
         ORDER BY F.departure_time
     """)
 
-@update_flight_statuses
-def cancel_flight(source_id, dest_id, departure_time):
+# Number of flights per page of customer search results
+SEARCH_PAGE_SIZE = 20
+
+# Customer search: the filters of search_flights are appended to this query,
+# then SEARCH_ORDER_SQL (idx_flight_search)
+SEARCH_FLIGHTS_SQL = """
+    SELECT 
+        F.flight_id, F.source_airport_id, F.dest_airport_id, F.departure_time,
+        F.economy_price, F.business_price, F.flight_status,
+        F.economy_seats_left, F.business_seats_left,
+        A1.airport_name as source_airport,
+        A2.airport_name as dest_airport,
+        AC.manufacturer, AC.is_large,
+        FR.flight_duration
+    FROM Flight F
+    JOIN Airport A1 ON F.source_airport_id = A1.airport_id
+    JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
+    JOIN Aircraft AC ON F.aircraft_id = AC.aircraft_id
+    JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id AND F.dest_airport_id = FR.dest_airport_id
+    WHERE F.flight_status = 'Active' AND F.departure_time > NOW()
+"""
+SEARCH_ORDER_SQL = " ORDER BY F.departure_time, F.source_airport_id, F.dest_airport_id LIMIT %s"
+
+def encode_search_cursor(flight):
+    """Keyset cursor of a search result: its position in (departure_time, source, dest) order."""
+    return f"{flight['departure_time'].strftime('%Y%m%d%H%M%S')}-{flight['source_airport_id']}-{flight['dest_airport_id']}"
+
+def decode_search_cursor(cursor):
+    try:
+        departure, source_id, dest_id = cursor.split('-')
+        return datetime.strptime(departure, '%Y%m%d%H%M%S'), int(source_id), int(dest_id)
+    except (AttributeError, ValueError):
+        return None
+
+def search_flights(source=None, dest=None, search_date=None, min_price=None, max_price=None,
+                   flight_class=None, after=None, page_size=SEARCH_PAGE_SIZE):
+    """
+    Customer flight search, one page at a time.
+    Airport names are resolved to ids up front and every filter is a range or
+    equality predicate on Flight columns, so the search can use
+    idx_flight_search (flight_status, departure_time, source_airport_id, dest_airport_id).
+    Returns (flights, next_cursor); next_cursor is None on the last page.
+    """
+    query = SEARCH_FLIGHTS_SQL
+    params = []
+
+    for column, airport_text in (('F.source_airport_id', source), ('F.dest_airport_id', dest)):
+        if airport_text:
+            airport_ids = reference_cache.find_airport_ids(airport_text)
+            if not airport_ids:
+                return [], None
+            query += f" AND {column} IN ({', '.join(['%s'] * len(airport_ids))})"
+            params.extend(airport_ids)
+
+    if search_date:
+        try:
+            day = datetime.strptime(search_date, '%Y-%m-%d')
+        except ValueError:
+            return [], None
+        query += " AND F.departure_time >= %s AND F.departure_time < %s"
+        params.extend([day, day + timedelta(days=1)])
+
+    price_column = 'F.business_price' if flight_class == 'Business' else 'F.economy_price'
+    if min_price:
+        query += f" AND {price_column} >= %s"
+        params.append(min_price)
+    if max_price:
+        query += f" AND {price_column} <= %s"
+        params.append(max_price)
+
+    # Keyset pagination: continue strictly after the last flight of the previous page
+    position = decode_search_cursor(after) if after else None
+    if position:
+        last_departure, last_source, last_dest = position
+        query += """
+            AND F.departure_time >= %s
+            AND (F.departure_time > %s
+                 OR (F.departure_time = %s
+                     AND (F.source_airport_id > %s
+                          OR (F.source_airport_id = %s AND F.dest_airport_id > %s))))
+        """
+        params.extend([last_departure, last_departure, last_departure,
+                       last_source, last_source, last_dest])
+
+    query += SEARCH_ORDER_SQL
+    params.append(page_size + 1)
+
+    flights = db.query_db(query, tuple(params))
+    next_cursor = None
+    if len(flights) > page_size:
+        flights = flights[:page_size]
+        next_cursor = encode_search_cursor(flights[-1])
+    return flights, next_cursor
+
+def _get_flight_key(flight_id):
+    return db.query_db(f"""
+        SELECT F.source_airport_id, F.dest_airport_id, F.departure_time, {EFFECTIVE_STATUS_SQL} as flight_status
+        FROM Flight F
+        WHERE F.flight_id = %s
+    """, (flight_id,), one=True)
+
+def cancel_flight(flight_id):
     try:
         # Check flight exists and get current status
-        flight = db.query_db("""
-            SELECT departure_time, flight_status FROM Flight 
-            WHERE source_airport_id = %s AND dest_airport_id = %s AND departure_time = %s
-        """, (source_id, dest_id, departure_time), one=True)
+        flight = _get_flight_key(flight_id)
         
         if not flight:
             return False, "Flight not found"
@@ -352,64 +561,69 @@ def cancel_flight(source_id, dest_id, departure_time):
         if flight['flight_status'] == 'Completed':
             return False, "Cannot cancel a completed flight"
 
-        # Update flight status to Cancelled (only if >= 72 hours before departure)
-        db.execute_db("""
-            UPDATE Flight 
-            SET flight_status = 'Cancelled'
-            WHERE source_airport_id = %s AND dest_airport_id = %s AND departure_time = %s
-            AND TIMESTAMPDIFF(HOUR, NOW(), departure_time) >= 72
-            AND flight_status != 'Cancelled'
-        """, (source_id, dest_id, departure_time))
+        # Flight and order updates are committed together
+        with db.transaction():
+            # Update flight status to Cancelled (only if >= 72 hours before departure)
+            db.execute_db("""
+                UPDATE Flight 
+                SET flight_status = 'Cancelled'
+                WHERE flight_id = %s
+                AND TIMESTAMPDIFF(HOUR, NOW(), departure_time) >= 72
+                AND flight_status != 'Cancelled'
+            """, (flight_id,))
         
-        # Check if flight was actually updated
-        updated_flight = db.query_db("""
-            SELECT flight_status FROM Flight 
-            WHERE source_airport_id = %s AND dest_airport_id = %s AND departure_time = %s
-        """, (source_id, dest_id, departure_time), one=True)
+            # Check if flight was actually updated
+            updated_flight = db.query_db("""
+                SELECT flight_status FROM Flight 
+                WHERE flight_id = %s
+            """, (flight_id,), one=True)
         
-        if updated_flight['flight_status'] == 'Cancelled':
-            # Get affected orders and total refund amount before updating
-            affected_orders = db.query_db("""
-                SELECT order_code, total_payment, customer_email
-                FROM Order_Table 
-                WHERE source_airport_id = %s 
-                AND dest_airport_id = %s 
-                AND departure_time = %s
-                AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
-            """, (source_id, dest_id, departure_time))
+            if updated_flight['flight_status'] == 'Cancelled':
+                # Get affected orders and total refund amount before updating
+                affected_orders = db.query_db("""
+                    SELECT order_code, total_payment, customer_email
+                    FROM Order_Table 
+                    WHERE flight_id = %s
+                    AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
+                """, (flight_id,))
             
-            total_refund = sum(float(order['total_payment']) for order in affected_orders)
-            order_count = len(affected_orders)
+                total_refund = sum(float(order['total_payment']) for order in affected_orders)
+                order_count = len(affected_orders)
             
-            # Update all related orders to 'System Cancelled' and set total_payment to 0 (full refund)
-            db.execute_db("""
-                UPDATE Order_Table 
-                SET order_status = 'System Cancelled',
-                    total_payment = 0.00
-                WHERE source_airport_id = %s 
-                AND dest_airport_id = %s 
-                AND departure_time = %s
-                AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
-            """, (source_id, dest_id, departure_time))
+                # Update all related orders to 'System Cancelled' and set total_payment to 0 (full refund)
+                db.execute_db("""
+                    UPDATE Order_Table 
+                    SET order_status = 'System Cancelled',
+                        total_payment = 0.00
+                    WHERE flight_id = %s
+                    AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
+                """, (flight_id,))
+                seat_inventory.release_flight_seats(flight_id)
             
-            # Build detailed refund message
-            if order_count > 0:
-                refund_message = f"Flight cancelled successfully. {order_count} order(s) cancelled with full refund of ${total_refund:.2f} processed. All customers will receive their full payment back."
+                # Build detailed refund message
+                if order_count > 0:
+                    refund_message = f"Flight cancelled successfully. {order_count} order(s) cancelled with full refund of ${total_refund:.2f} processed. All customers will receive their full payment back."
+                else:
+                    refund_message = "Flight cancelled successfully. No active orders were affected."
             else:
-                refund_message = "Flight cancelled successfully. No active orders were affected."
-            
-            return True, refund_message
-        else:
-            return False, "Could not cancel flight (less than 72 hours before departure or already cancelled)"
+                return False, "Could not cancel flight (less than 72 hours before departure or already cancelled)"
+
+        seat_inventory.record_recount(flight_id)
+        get_schedule_index().record_status(flight['source_airport_id'], flight['dest_airport_id'],
+                                           flight['departure_time'], 'Cancelled')
+        get_connection_index().invalidate()
+        get_fare_calendar().refresh_day(flight['source_airport_id'], flight['dest_airport_id'],
+                                        flight['departure_time'])
+        return True, refund_message
 
     except Exception as e:
         return False, str(e)
 
-@update_flight_statuses
-def get_flight_details(source_id, dest_id, departure_time):
+def get_flight_details(flight_id):
     # Get flight info + aircraft info
-    flight = db.query_db("""
-        SELECT F.*, 
+    flight = db.query_db(f"""
+        SELECT F.flight_id, F.source_airport_id, F.dest_airport_id, F.departure_time, F.aircraft_id,
+               F.economy_price, F.business_price, {EFFECTIVE_STATUS_SQL} as flight_status,
                A1.airport_name as source, 
                A2.airport_name as dest,
                AC.manufacturer, AC.is_large
@@ -417,10 +631,8 @@ def get_flight_details(source_id, dest_id, departure_time):
         JOIN Airport A1 ON F.source_airport_id = A1.airport_id
         JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
         LEFT JOIN Aircraft AC ON F.aircraft_id = AC.aircraft_id
-        WHERE F.source_airport_id = %s 
-          AND F.dest_airport_id = %s 
-          AND F.departure_time = %s
-    """, (source_id, dest_id, departure_time), one=True)
+        WHERE F.flight_id = %s
+    """, (flight_id,), one=True)
 
     if not flight:
         return None
@@ -431,38 +643,63 @@ def get_flight_details(source_id, dest_id, departure_time):
         FROM Employee_Flight_Assignment EFA
         JOIN Employee E ON EFA.employee_id = E.id_number
         JOIN Flight_Crew FC ON E.id_number = FC.id_number
-        WHERE EFA.source_airport_id = %s 
-          AND EFA.dest_airport_id = %s 
-          AND EFA.departure_time = %s
-    """, (source_id, dest_id, departure_time))
+        WHERE EFA.flight_id = %s
+    """, (flight_id,))
 
     flight['crew'] = crew
     return flight
 
-def update_flight_status(source_id, dest_id, departure_time, new_status):
+def update_flight_status(flight_id, new_status):
     try:
-        db.execute_db("""
-            UPDATE Flight 
-            SET flight_status = %s
-            WHERE source_airport_id = %s AND dest_airport_id = %s AND departure_time = %s
-        """, (new_status, source_id, dest_id, departure_time))
-        
-        # If status is set to 'Cancelled', update all related orders to 'System Cancelled'
-        if new_status == 'Cancelled':
+        flight = _get_flight_key(flight_id)
+        if not flight:
+            return False, "Flight not found"
+
+        # Flight and order updates are committed together
+        with db.transaction():
             db.execute_db("""
-                UPDATE Order_Table 
-                SET order_status = 'System Cancelled'
-                WHERE source_airport_id = %s 
-                AND dest_airport_id = %s 
-                AND departure_time = %s
-                AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
-            """, (source_id, dest_id, departure_time))
-            return True, "Flight status updated to Cancelled. All related orders have been cancelled."
+                UPDATE Flight 
+                SET flight_status = %s
+                WHERE flight_id = %s
+            """, (new_status, flight_id))
         
-        return True, "Status updated successfully"
+            # If status is set to 'Cancelled', update all related orders to 'System Cancelled'
+            if new_status == 'Cancelled':
+                db.execute_db("""
+                    UPDATE Order_Table 
+                    SET order_status = 'System Cancelled'
+                    WHERE flight_id = %s
+                    AND order_status NOT IN ('Cancelled', 'Customer Cancelled', 'System Cancelled')
+                """, (flight_id,))
+                seat_inventory.release_flight_seats(flight_id)
+                message = "Flight status updated to Cancelled. All related orders have been cancelled."
+            else:
+                message = "Status updated successfully"
+        
+        if new_status == 'Cancelled':
+            seat_inventory.record_recount(flight_id)
+        get_schedule_index().record_status(flight['source_airport_id'], flight['dest_airport_id'],
+                                           flight['departure_time'], new_status)
+        get_connection_index().invalidate()
+        get_fare_calendar().refresh_day(flight['source_airport_id'], flight['dest_airport_id'],
+                                        flight['departure_time'])
+        return True, message
     except Exception as e:
         return False, str(e)
 
+INSERT_SEAT_SQL = """
+    INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`)
+    VALUES (%s, %s, %s, %s)
+"""
+
+def generate_seat_rows(aircraft_id, is_business, num_rows, num_columns):
+    """Returns the Seat parameter tuples for one cabin class (rows and columns start at 1)."""
+    return [
+        (aircraft_id, is_business, row, col)
+        for row in range(1, num_rows + 1)
+        for col in range(1, num_columns + 1)
+    ]
+
 def add_aircraft(aircraft_id, manufacturer, purchase_date, is_large, business_config, economy_config):
     """
     Adds a new aircraft with classes and seats.
@@ -488,41 +725,37 @@ def add_aircraft(aircraft_id, manufacturer, purchase_date, is_large, business_co
         if not economy_config or 'num_rows' not in economy_config or 'num_columns' not in economy_config:
             return False, 'Economy class configuration is required.'
         
-        # Insert into Aircraft table
-        db.execute_db("""
-            INSERT INTO Aircraft (aircraft_id, manufacturer, purchase_date, is_large)
-            VALUES (%s, %s, %s, %s)
-        """, (aircraft_id, manufacturer, purchase_date, is_large))
-        
-        # Insert Economy Class (always required)
-        db.execute_db("""
-            INSERT INTO Aircraft_Class (aircraft_id, is_business, num_rows, num_columns)
-            VALUES (%s, %s, %s, %s)
-        """, (aircraft_id, False, economy_config['num_rows'], economy_config['num_columns']))
-        
-        # Generate Economy seats
-        for row in range(1, economy_config['num_rows'] + 1):
-            for col in range(1, economy_config['num_columns'] + 1):
-                db.execute_db("""
-                    INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`)
-                    VALUES (%s, %s, %s, %s)
-                """, (aircraft_id, False, row, col))
+        # Aircraft, classes and seats are committed together
+        with db.transaction():
+            # Insert into Aircraft table
+            db.execute_db("""
+                INSERT INTO Aircraft (aircraft_id, manufacturer, purchase_date, is_large)
+                VALUES (%s, %s, %s, %s)
+            """, (aircraft_id, manufacturer, purchase_date, is_large))
         
-        # Insert Business Class if provided
-        if business_config and 'num_rows' in business_config and 'num_columns' in business_config:
+            # Insert Economy Class (always required)
             db.execute_db("""
                 INSERT INTO Aircraft_Class (aircraft_id, is_business, num_rows, num_columns)
                 VALUES (%s, %s, %s, %s)
-            """, (aircraft_id, True, business_config['num_rows'], business_config['num_columns']))
+            """, (aircraft_id, False, economy_config['num_rows'], economy_config['num_columns']))
+        
+            # Generate Economy seats
+            seat_rows = generate_seat_rows(aircraft_id, False, economy_config['num_rows'], economy_config['num_columns'])
+        
+            # Insert Business Class if provided
+            if business_config and 'num_rows' in business_config and 'num_columns' in business_config:
+                db.execute_db("""
+                    INSERT INTO Aircraft_Class (aircraft_id, is_business, num_rows, num_columns)
+                    VALUES (%s, %s, %s, %s)
+                """, (aircraft_id, True, business_config['num_rows'], business_config['num_columns']))
             
-            # Generate Business seats
-            for row in range(1, business_config['num_rows'] + 1):
-                for col in range(1, business_config['num_columns'] + 1):
-                    db.execute_db("""
-                        INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`)
-                        VALUES (%s, %s, %s, %s)
-                    """, (aircraft_id, True, row, col))
+                # Generate Business seats
+                seat_rows += generate_seat_rows(aircraft_id, True, business_config['num_rows'], business_config['num_columns'])
+        
+            # Insert all seats in batches
+            db.execute_many_db(INSERT_SEAT_SQL, seat_rows)
         
+        reference_cache.invalidate('aircrafts')
         return True, 'Aircraft added successfully!'
     
     except Exception as e:
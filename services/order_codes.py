@@ -0,0 +1,71 @@
+import os
+import threading
+import db
+
+# Order codes are 6-digit numbers. Each process reserves a block of sequence
+# numbers in one statement and maps them to codes with a fixed permutation of
+# the code space, so codes never repeat. The permutation only scatters the codes:
+# it is a public affine map, so codes are predictable and are not a secret (orders
+# are looked up by code together with the customer's email).
+ORDER_CODE_MIN = 100000
+ORDER_CODE_SPACE = 900000          # codes 100000 .. 999999
+ORDER_CODE_MULTIPLIER = 620347     # coprime with ORDER_CODE_SPACE, so the mapping is a bijection
+ORDER_CODE_OFFSET = 271828
+ORDER_CODE_BLOCK_SIZE = int(os.getenv('ORDER_CODE_BLOCK_SIZE', '100'))
+
+class OrderCodesExhaustedError(Exception):
+    """Raised when every code of the code space has been handed out."""
+    pass
+
+def sequence_to_code(n):
+    return ORDER_CODE_MIN + (n * ORDER_CODE_MULTIPLIER + ORDER_CODE_OFFSET) % ORDER_CODE_SPACE
+
+class OrderCodeAllocator:
+    """Hands out order codes from blocks of the Order_Code_Sequence counter reserved by this process."""
+
+    def __init__(self, block_size=ORDER_CODE_BLOCK_SIZE):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._codes = []
+        self._pid = None
+
+    def _reserve_block(self):
+        # Runs on the request's connection and commits on its own, so it has to happen
+        # before the booking transaction opens: a booking that rolls back then never
+        # returns its block to the sequence
+        if db.in_transaction():
+            raise RuntimeError("Order codes must be reserved outside a transaction")
+        db.execute_db("""
+            INSERT INTO Order_Code_Sequence (name, next_value) VALUES ('order_code', LAST_INSERT_ID(%s))
+            ON DUPLICATE KEY UPDATE next_value = LAST_INSERT_ID(next_value + %s)
+        """, (self.block_size, self.block_size))
+        end = db.query_db("SELECT LAST_INSERT_ID() AS end_value", one=True)['end_value']
+
+        start = end - self.block_size
+        if start >= ORDER_CODE_SPACE:
+            raise OrderCodesExhaustedError("No order codes left")
+        codes = [sequence_to_code(n) for n in range(start, min(end, ORDER_CODE_SPACE))]
+
+        # Codes issued before the allocator existed were random: skip those
+        placeholders = ', '.join(['%s'] * len(codes))
+        taken = {row['order_code'] for row in db.query_db(
+            f"SELECT order_code FROM Order_Table WHERE order_code IN ({placeholders})", tuple(codes))}
+        return [code for code in codes if code not in taken]
+
+    def next_code(self):
+        with self._lock:
+            # A forked worker must not reuse its parent's block
+            if self._pid != os.getpid():
+                self._codes = []
+                self._pid = os.getpid()
+            while not self._codes:
+                self._codes = self._reserve_block()
+                # Issue in sequence order
+                self._codes.reverse()
+            return self._codes.pop()
+
+_allocator = OrderCodeAllocator()
+
+def next_order_code():
+    """Returns a new order code. Call it before opening the booking transaction."""
+    return _allocator.next_code()
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+import db
+from services.airport_index import AirportNameIndex
+
+# Process-local cache for reference data (airports, routes, aircraft, crew rosters).
+# Writes made by this process call invalidate(); the TTL covers writes made by
+# other processes or directly in the database.
+REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', '300'))
+
+_LOADERS = {
+    'airports': lambda: db.query_db("SELECT * FROM Airport ORDER BY airport_name"),
+    'routes': lambda: db.query_db("SELECT source_airport_id, dest_airport_id, flight_duration FROM Flight_Route"),
+    'aircrafts': lambda: db.query_db("SELECT * FROM Aircraft ORDER BY aircraft_id"),
+    'pilots': lambda: db.query_db("""
+        SELECT E.id_number, E.first_name, E.last_name, FC.trained_for_long_flights
+        FROM Employee E
+        JOIN Flight_Crew FC ON E.id_number = FC.id_number
+        WHERE FC.is_pilot = 1
+    """),
+    'attendants': lambda: db.query_db("""
+        SELECT E.id_number, E.first_name, E.last_name, FC.trained_for_long_flights
+        FROM Employee E
+        JOIN Flight_Crew FC ON E.id_number = FC.id_number
+        WHERE FC.is_pilot = 0
+    """)
+}
+
+_entries = {}  # name -> (loaded_at, rows, lookup maps)
+_lock = threading.Lock()
+
+def _build_maps(name, rows):
+    if name == 'airports':
+        return {'by_id': {a['airport_id']: a for a in rows}, 'by_name': {a['airport_name']: a for a in rows},
+                'search': AirportNameIndex(rows)}
+    if name == 'routes':
+        return {'by_pair': {(r['source_airport_id'], r['dest_airport_id']): r for r in rows}}
+    if name == 'aircrafts':
+        return {'by_id': {a['aircraft_id']: a for a in rows}}
+    return {}
+
+def _get(name):
+    with _lock:
+        entry = _entries.get(name)
+    if entry is None or time.monotonic() - entry[0] > REFERENCE_CACHE_TTL:
+        rows = _LOADERS[name]()
+        entry = (time.monotonic(), rows, _build_maps(name, rows))
+        with _lock:
+            _entries[name] = entry
+    return entry
+
+def get_rows(name):
+    """Returns a copy of a cached table (callers may modify the returned dicts)."""
+    return [dict(row) for row in _get(name)[1]]
+
+def warm(*names):
+    """Loads the given datasets (all of them when called without arguments) ahead of the first request."""
+    for name in names or _LOADERS:
+        _get(name)
+
+def invalidate(*names):
+    """Drops the given datasets (all of them when called without arguments)."""
+    with _lock:
+        if not names:
+            _entries.clear()
+        for name in names:
+            _entries.pop(name, None)
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_airport(airport_id):
+    airport = _get('airports')[2]['by_id'].get(_to_int(airport_id))
+    return dict(airport) if airport else None
+
+def get_airport_by_name(airport_name):
+    airport = _get('airports')[2]['by_name'].get(airport_name)
+    return dict(airport) if airport else None
+
+def find_airport_ids(text):
+    """Returns the ids of the airports whose name contains `text` (case- and accent-insensitive)."""
+    return _get('airports')[2]['search'].matching_ids(text)
+
+def search_airports(text, limit=10):
+    """Airport name autocomplete, answered from the in-memory index."""
+    return _get('airports')[2]['search'].search(text, limit)
+
+def get_airport_name(airport_id, default="Unknown"):
+    airport = _get('airports')[2]['by_id'].get(_to_int(airport_id))
+    return airport['airport_name'] if airport else default
+
+def get_route_duration(source_id, dest_id):
+    route = _get('routes')[2]['by_pair'].get((_to_int(source_id), _to_int(dest_id)))
+    return route['flight_duration'] if route else 0
+
+def get_aircraft(aircraft_id):
+    aircraft = _get('aircrafts')[2]['by_id'].get(_to_int(aircraft_id))
+    return dict(aircraft) if aircraft else None
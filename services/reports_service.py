@@ -1,7 +1,5 @@
 from db import query_db
-from services.flight_service import update_flight_statuses
 
-@update_flight_statuses
 def get_occupancy_report():
     return query_db("""
         SELECT 
@@ -12,16 +10,13 @@ def get_occupancy_report():
         FROM Flight F
         JOIN Airport A1 ON F.source_airport_id = A1.airport_id
         JOIN Airport A2 ON F.dest_airport_id = A2.airport_id
-        LEFT JOIN Order_Table O ON F.source_airport_id = O.source_airport_id 
-                                AND F.dest_airport_id = O.dest_airport_id 
-                                AND F.departure_time = O.departure_time
+        LEFT JOIN Order_Table O ON F.flight_id = O.flight_id
                                 AND O.order_status = 'Active'
         LEFT JOIN Order_Seats OS ON O.order_code = OS.order_code
         WHERE F.departure_time < NOW() AND F.flight_status != 'Cancelled'
-        GROUP BY F.source_airport_id, F.dest_airport_id, F.departure_time, F.aircraft_id
+        GROUP BY F.flight_id, F.aircraft_id
     """)
 
-@update_flight_statuses
 def get_revenue_report():
     return query_db("""
         SELECT 
@@ -30,16 +25,13 @@ def get_revenue_report():
             OS.is_business, 
             SUM(O.total_payment) as total_revenue
         FROM Order_Table O
-        JOIN Flight F ON O.source_airport_id = F.source_airport_id 
-                      AND O.dest_airport_id = F.dest_airport_id 
-                      AND O.departure_time = F.departure_time
+        JOIN Flight F ON O.flight_id = F.flight_id
         JOIN Aircraft AC ON F.aircraft_id = AC.aircraft_id
         JOIN (SELECT DISTINCT order_code, is_business FROM Order_Seats) OS ON O.order_code = OS.order_code
         WHERE O.order_status = 'Active'
         GROUP BY AC.manufacturer, AC.is_large, OS.is_business
     """)
 
-@update_flight_statuses
 def get_employee_hours_report():
     return query_db("""
         SELECT 
@@ -52,27 +44,27 @@ def get_employee_hours_report():
         FROM Employee E
         JOIN Flight_Crew FC ON E.id_number = FC.id_number
         JOIN Employee_Flight_Assignment EFA ON E.id_number = EFA.employee_id
-        JOIN Flight F ON EFA.source_airport_id = F.source_airport_id 
-                      AND EFA.dest_airport_id = F.dest_airport_id 
-                      AND EFA.departure_time = F.departure_time
+        JOIN Flight F ON EFA.flight_id = F.flight_id
         JOIN Flight_Route FR ON F.source_airport_id = FR.source_airport_id 
                              AND F.dest_airport_id = FR.dest_airport_id
         WHERE F.flight_status != 'Cancelled'
         GROUP BY E.id_number
     """)
 
+# Orders and cancellations per month, read from idx_order_date alone
+CANCELLATION_REPORT_SQL = """
+    SELECT 
+        DATE_FORMAT(order_date, '%Y-%m') as month,
+        COUNT(*) as total_orders,
+        SUM(CASE WHEN order_status LIKE '%Cancelled%' THEN 1 ELSE 0 END) as cancelled_orders,
+        (SUM(CASE WHEN order_status LIKE '%Cancelled%' THEN 1 ELSE 0 END) / COUNT(*)) * 100 as cancellation_rate
+    FROM Order_Table
+    GROUP BY DATE_FORMAT(order_date, '%Y-%m')
+"""
+
 def get_cancellation_report():
-    return query_db("""
-        SELECT 
-            DATE_FORMAT(order_date, '%Y-%m') as month,
-            COUNT(*) as total_orders,
-            SUM(CASE WHEN order_status LIKE '%Cancelled%' THEN 1 ELSE 0 END) as cancelled_orders,
-            (SUM(CASE WHEN order_status LIKE '%Cancelled%' THEN 1 ELSE 0 END) / COUNT(*)) * 100 as cancellation_rate
-        FROM Order_Table
-        GROUP BY DATE_FORMAT(order_date, '%Y-%m')
-    """)
+    return query_db(CANCELLATION_REPORT_SQL)
 
-@update_flight_statuses
 def get_plane_activity_report():
     return query_db("""
         SELECT 
@@ -0,0 +1,224 @@
+import bisect
+import os
+import threading
+import time
+from datetime import datetime
+import db
+from services import reference_cache
+
+# Process-local index of aircraft and crew schedules.
+# The database stays the source of truth: the index is loaded from it lazily,
+# updated incrementally by this process's writes, and fully reloaded after
+# SCHEDULE_INDEX_MAX_AGE seconds to pick up writes made by other processes.
+SCHEDULE_INDEX_ENABLED = os.getenv('SCHEDULE_INDEX_ENABLED', '1') == '1'
+SCHEDULE_INDEX_MAX_AGE = int(os.getenv('SCHEDULE_INDEX_MAX_AGE', '60'))
+
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M')
+
+def parse_departure_time(value):
+    """Returns a datetime for the departure time formats used by forms and URLs."""
+    if isinstance(value, datetime):
+        return value
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid departure time: {value}")
+
+def flight_key(source_id, dest_id, departure_time):
+    return (int(source_id), int(dest_id), parse_departure_time(departure_time))
+
+class ResourceTimeline:
+    """Occupied intervals of one aircraft or employee, sorted by departure time."""
+
+    def __init__(self):
+        self._entries = []  # [(departure_time, flight_key)]
+
+    def add(self, key):
+        entry = (key[2], key)
+        i = bisect.bisect_left(self._entries, entry)
+        if i == len(self._entries) or self._entries[i] != entry:
+            self._entries.insert(i, entry)
+
+    def remove(self, key):
+        entry = (key[2], key)
+        i = bisect.bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    def previous(self, t):
+        # Last occupation departing before t
+        i = bisect.bisect_left(self._entries, (t,))
+        return self._entries[i - 1][1] if i > 0 else None
+
+    def next(self, t):
+        # First occupation departing at or after t
+        i = bisect.bisect_left(self._entries, (t,))
+        return self._entries[i][1] if i < len(self._entries) else None
+
+class ScheduleIndex:
+    """
+    Keeps each aircraft's active flights and each employee's assignments,
+    keyed by resource id, and answers "previous/next occupation around T"
+    in O(log n) per resource.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._flights = {}        # flight_key -> flight info
+        self._aircraft = {}       # aircraft_id -> ResourceTimeline (active flights)
+        self._crew = {}           # employee_id -> ResourceTimeline (all assignments)
+        self._flight_crew = {}    # flight_key -> [employee_id]
+        self._airport_names = {}
+        self._durations = {}
+
+    def _load(self):
+        airports = reference_cache.get_rows('airports')
+        routes = reference_cache.get_rows('routes')
+        flights = db.query_db("""
+            SELECT source_airport_id, dest_airport_id, departure_time, flight_status, aircraft_id
+            FROM Flight
+        """)
+        assignments = db.query_db("""
+            SELECT employee_id, source_airport_id, dest_airport_id, departure_time
+            FROM Employee_Flight_Assignment
+        """)
+
+        self._flights = {}
+        self._aircraft = {}
+        self._crew = {}
+        self._flight_crew = {}
+        self._airport_names = {a['airport_id']: a['airport_name'] for a in airports}
+        self._durations = {(r['source_airport_id'], r['dest_airport_id']): r['flight_duration'] for r in routes}
+
+        for f in flights:
+            self._add_flight(f['source_airport_id'], f['dest_airport_id'], f['departure_time'],
+                             f['aircraft_id'], f['flight_status'])
+        for a in assignments:
+            key = flight_key(a['source_airport_id'], a['dest_airport_id'], a['departure_time'])
+            self._assign(a['employee_id'], key)
+
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > SCHEDULE_INDEX_MAX_AGE:
+            self._load()
+
+    def _add_flight(self, source_id, dest_id, departure_time, aircraft_id, status):
+        key = flight_key(source_id, dest_id, departure_time)
+        self._flights[key] = {
+            'source_airport_id': key[0],
+            'dest_airport_id': key[1],
+            'departure_time': key[2],
+            'flight_duration': self._durations.get((key[0], key[1]), 0),
+            'aircraft_id': int(aircraft_id) if aircraft_id is not None else None,
+            'flight_status': status
+        }
+        if status == 'Active' and aircraft_id is not None:
+            self._aircraft.setdefault(int(aircraft_id), ResourceTimeline()).add(key)
+        return key
+
+    def _assign(self, employee_id, key):
+        self._crew.setdefault(str(employee_id), ResourceTimeline()).add(key)
+        self._flight_crew.setdefault(key, []).append(str(employee_id))
+
+    def _previous_row(self, key):
+        f = self._flights[key]
+        return {
+            'dest_airport_id': f['dest_airport_id'],
+            'departure_time': f['departure_time'],
+            'flight_duration': f['flight_duration'],
+            'airport_name': self._airport_names.get(f['dest_airport_id'], "Unknown")
+        }
+
+    def _next_row(self, key):
+        f = self._flights[key]
+        return {
+            'source_airport_id': f['source_airport_id'],
+            'departure_time': f['departure_time'],
+            'airport_name': self._airport_names.get(f['source_airport_id'], "Unknown")
+        }
+
+    def aircraft_neighbours(self, departure_time):
+        """
+        Returns ({aircraft_id: previous flight}, {aircraft_id: next flight}) around
+        departure_time, considering active flights that have not departed yet.
+        """
+        now = datetime.now()
+        prev_flights, next_flights = {}, {}
+        with self._lock:
+            self._ensure_loaded()
+            for aircraft_id, timeline in self._aircraft.items():
+                prev_key = timeline.previous(departure_time)
+                # Departed flights count as 'Completed' and no longer block the aircraft
+                if prev_key and prev_key[2] >= now:
+                    prev_flights[aircraft_id] = self._previous_row(prev_key)
+                next_key = timeline.next(max(departure_time, now))
+                if next_key:
+                    next_flights[aircraft_id] = self._next_row(next_key)
+        return prev_flights, next_flights
+
+    def crew_neighbours(self, departure_time):
+        """
+        Returns ({employee_id: previous assignment}, {employee_id: next assignment})
+        around departure_time.
+        """
+        prev_flights, next_flights = {}, {}
+        with self._lock:
+            self._ensure_loaded()
+            for employee_id, timeline in self._crew.items():
+                prev_key = timeline.previous(departure_time)
+                if prev_key:
+                    prev_flights[employee_id] = self._previous_row(prev_key)
+                next_key = timeline.next(departure_time)
+                if next_key:
+                    next_flights[employee_id] = self._next_row(next_key)
+        return prev_flights, next_flights
+
+    def record_flight(self, source_id, dest_id, departure_time, aircraft_id, crew_ids):
+        """Adds a newly created flight and its crew assignments."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            try:
+                key = self._add_flight(source_id, dest_id, departure_time, aircraft_id, 'Active')
+            except ValueError:
+                # Unknown format: rebuild from the database on next use
+                self._loaded_at = None
+                return
+            for employee_id in crew_ids:
+                self._assign(employee_id, key)
+
+    def record_status(self, source_id, dest_id, departure_time, new_status):
+        """Applies a flight status change (crew assignments are kept, as in the database)."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            try:
+                key = flight_key(source_id, dest_id, departure_time)
+            except ValueError:
+                self._loaded_at = None
+                return
+            flight = self._flights.get(key)
+            if not flight:
+                self._loaded_at = None
+                return
+            flight['flight_status'] = new_status
+            if flight['aircraft_id'] is None:
+                return
+            timeline = self._aircraft.setdefault(flight['aircraft_id'], ResourceTimeline())
+            if new_status == 'Active':
+                timeline.add(key)
+            else:
+                timeline.remove(key)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+_index = ScheduleIndex()
+
+def get_schedule_index():
+    return _index
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# In-process publish/subscribe of seat changes, used by the seat map event stream.
+# The broker lives in one process: a stream only sees the changes committed by the
+# process serving it, and every open stream keeps one worker thread of that process
+# busy. Streams therefore end after SEAT_EVENTS_MAX_STREAM_SECONDS and the browser
+# reconnects (EventSource does so on its own), sending the last version it saw; the
+# stream then starts with a resync event if the flight changed in the meantime.
+# Deployments with several worker processes still get every change, through the
+# version gaps the client detects, just not always live; polling /api/seat_map
+# (it answers 304 while the inventory version is unchanged) is the fallback.
+SEAT_EVENTS_KEEPALIVE = int(os.getenv('SEAT_EVENTS_KEEPALIVE', '15'))
+SEAT_EVENTS_QUEUE_SIZE = int(os.getenv('SEAT_EVENTS_QUEUE_SIZE', '100'))
+SEAT_EVENTS_MAX_STREAM_SECONDS = int(os.getenv('SEAT_EVENTS_MAX_STREAM_SECONDS', '300'))
+
+class Subscription:
+    """Pending events of one stream. Overflowing the queue turns it into a single resync event."""
+
+    def __init__(self, key):
+        self.key = key
+        self._events = deque()
+        self._overflowed = False
+        self._ready = threading.Condition()
+
+    def push(self, event):
+        with self._ready:
+            if len(self._events) >= SEAT_EVENTS_QUEUE_SIZE:
+                self._events.clear()
+                self._overflowed = True
+            if not self._overflowed:
+                self._events.append(event)
+            self._ready.notify()
+
+    def get(self, timeout):
+        """Returns the next event, a resync event, or None after `timeout` seconds."""
+        with self._ready:
+            if not self._events and not self._overflowed:
+                self._ready.wait(timeout)
+            if self._overflowed:
+                self._overflowed = False
+                return {'type': 'resync'}
+            return self._events.popleft() if self._events else None
+
+class SeatEventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}  # flight_id -> set of Subscription
+
+    def subscribe(self, key):
+        subscription = Subscription(key)
+        with self._lock:
+            self._subscribers.setdefault(key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.key)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.key]
+
+    def publish(self, key, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+_broker = SeatEventBroker()
+
+def get_broker():
+    return _broker
+
+def publish_seats(key, version, seats, taken):
+    """Notifies the streams of a flight that `seats` [(is_business, row, col)] were taken or released."""
+    _broker.publish(key, {
+        'type': 'seats',
+        'version': version,
+        'taken': taken,
+        'seats': [{'class': 'business' if is_business else 'economy', 'row': int(row), 'col': int(col)}
+                  for is_business, row, col in seats]
+    })
+
+def publish_resync(key):
+    """Tells the streams of a flight to reload its whole seat map (e.g. after a recount)."""
+    _broker.publish(key, {'type': 'resync'})
+
+def format_event(event):
+    """Serializes an event in the text/event-stream format (its version is the event id)."""
+    data = {k: v for k, v in event.items() if k != 'type'}
+    event_id = f"id: {event['version']}\n" if event.get('version') is not None else ""
+    return f"{event_id}event: {event['type']}\ndata: {json.dumps(data)}\n\n"
+
+def stream_events(key, version, last_version=None, keepalive=SEAT_EVENTS_KEEPALIVE,
+                  max_seconds=SEAT_EVENTS_MAX_STREAM_SECONDS):
+    """
+    Yields the event stream of one flight for at most `max_seconds`, or until the client
+    disconnects. `version` is the flight's inventory version when the stream opens and
+    `last_version` the one the client saw last (Last-Event-ID of a reconnect).
+    """
+    subscription = _broker.subscribe(key)
+    deadline = time.monotonic() + max_seconds
+    try:
+        yield "retry: 5000\n\n"
+        # Sets the event id, so a reconnect reports the version this stream started from
+        yield f"id: {version}\n\n"
+        if last_version is not None and last_version != version:
+            yield format_event({'type': 'resync'})
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The client reconnects after the retry delay
+                return
+            event = subscription.get(min(keepalive, remaining))
+            if event is None:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+            else:
+                yield format_event(event)
+    finally:
+        _broker.unsubscribe(subscription)
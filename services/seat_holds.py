@@ -0,0 +1,103 @@
+import os
+import secrets
+import db
+
+# Seconds a selected seat stays reserved for the customer who selected it
+SEAT_HOLD_TTL = int(os.getenv('SEAT_HOLD_TTL', '600'))
+# Rows deleted per statement by the expiry sweep
+SEAT_HOLD_SWEEP_CHUNK = int(os.getenv('SEAT_HOLD_SWEEP_CHUNK', '1000'))
+
+def new_hold_token():
+    return secrets.token_hex(16)
+
+def hold_seats(token, flight_id, seats):
+    """
+    Replaces the seats held by `token` on a flight with `seats` [(is_business, row, col)]
+    and (re)starts their expiry. Seats held by someone else or already booked are not
+    held and are returned as conflicts; the other seats are held either way.
+
+    Holds only lock the rows of the requested seats, so customers competing for a
+    flight only wait on each other when they pick the same seats. Call it outside the
+    booking transaction: it commits on its own and takes no lock on the flight.
+    """
+    requested = {(bool(is_business), int(row), int(col)) for is_business, row, col in seats}
+
+    with db.transaction():
+        db.execute_db("""
+            DELETE FROM Seat_Hold
+            WHERE hold_token = %s AND flight_id = %s
+        """, (token, flight_id))
+
+        if requested:
+            # Takes over a seat only if its current hold has expired (or is already ours).
+            # Each assignment repeats the whole test instead of reading the column set
+            # before it: once hold_token is taken over the token match keeps it true
+            db.execute_many_db("""
+                INSERT INTO Seat_Hold (flight_id, is_business, `row_number`, `column_number`, hold_token, expires_at)
+                VALUES (%s, %s, %s, %s, %s, NOW() + INTERVAL %s SECOND) AS new_hold
+                ON DUPLICATE KEY UPDATE
+                    hold_token = IF(Seat_Hold.expires_at <= NOW() OR Seat_Hold.hold_token = new_hold.hold_token,
+                                    new_hold.hold_token, Seat_Hold.hold_token),
+                    expires_at = IF(Seat_Hold.expires_at <= NOW() OR Seat_Hold.hold_token = new_hold.hold_token,
+                                    new_hold.expires_at, Seat_Hold.expires_at)
+            """, [(flight_id, is_business, row, col, token, SEAT_HOLD_TTL)
+                  for is_business, row, col in sorted(requested)])
+
+        held = {(bool(h['is_business']), h['row_number'], h['column_number']) for h in db.query_db("""
+            SELECT is_business, `row_number`, `column_number`
+            FROM Seat_Hold
+            WHERE hold_token = %s AND flight_id = %s
+        """, (token, flight_id))}
+        conflicts = requested - held
+
+        # A free hold row does not mean a free seat: drop holds on booked seats.
+        # Plain read (a locking read would gap-lock the free seats of the flight):
+        # a booking it does not see yet is rejected by uq_order_seats_live when the
+        # order's seats are inserted.
+        if held:
+            placeholders = ', '.join(['(%s, %s, %s)'] * len(held))
+            booked = {(bool(s['is_business']), s['row_number'], s['column_number']) for s in db.query_db(f"""
+                SELECT is_business, `row_number`, `column_number`
+                FROM Order_Seats
+                WHERE flight_id = %s
+                AND (is_business, `row_number`, `column_number`) IN ({placeholders})
+                AND is_live = 1
+            """, (flight_id,) + tuple(v for seat in sorted(held) for v in seat))}
+            if booked:
+                release_seats(token, flight_id, booked)
+                conflicts |= booked
+
+    return sorted(conflicts)
+
+def get_held_seats(flight_id, exclude_token=None):
+    """Seats of a flight currently held by other customers, as {is_business: [(row, col)]}."""
+    held = {}
+    for h in db.query_db("""
+        SELECT is_business, `row_number`, `column_number`
+        FROM Seat_Hold
+        WHERE flight_id = %s AND expires_at > NOW() AND hold_token <> %s
+    """, (flight_id, exclude_token or '')):
+        held.setdefault(bool(h['is_business']), []).append((h['row_number'], h['column_number']))
+    return held
+
+def release_seats(token, flight_id, seats):
+    """Drops the holds of `token` on the given seats of a flight."""
+    db.execute_many_db("""
+        DELETE FROM Seat_Hold
+        WHERE hold_token = %s AND flight_id = %s
+          AND is_business = %s AND `row_number` = %s AND `column_number` = %s
+    """, [(token, flight_id, is_business, row, col) for is_business, row, col in seats])
+
+def release_holds(token, flight_id):
+    """Drops all the holds of `token` on a flight (e.g. once they became an order)."""
+    db.execute_db("DELETE FROM Seat_Hold WHERE hold_token = %s AND flight_id = %s", (token, flight_id))
+
+def sweep_expired_holds():
+    """Deletes expired holds in small chunks (keeps each statement's lock footprint short)."""
+    removed = 0
+    while True:
+        deleted = db.execute_db("DELETE FROM Seat_Hold WHERE expires_at <= NOW() LIMIT %s",
+                                (SEAT_HOLD_SWEEP_CHUNK,), rowcount=True)
+        removed += deleted
+        if deleted < SEAT_HOLD_SWEEP_CHUNK:
+            return removed
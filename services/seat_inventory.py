@@ -0,0 +1,322 @@
+import base64
+import os
+import threading
+from collections import OrderedDict
+import db
+from services import seat_events
+
+# Number of flights whose seat maps are kept in memory (least recently used are dropped)
+SEAT_MAP_CACHE_SIZE = int(os.getenv('SEAT_MAP_CACHE_SIZE', '512'))
+
+# Recomputes the seat counters of flights from the cabin configuration and live orders.
+# Used for seeding, after flight-level status changes, and to repair drift.
+RECOUNT_SEATS_SQL = """
+    UPDATE Flight F
+    SET F.economy_seats_left = (
+            SELECT COALESCE(SUM(AC.num_rows * AC.num_columns), 0)
+            FROM Aircraft_Class AC
+            WHERE AC.aircraft_id = F.aircraft_id AND AC.is_business = 0
+        ) - (
+            SELECT COUNT(*)
+            FROM Order_Seats OS
+            WHERE OS.flight_id = F.flight_id
+              AND OS.is_business = 0
+              AND OS.is_live = 1
+        ),
+        F.business_seats_left = (
+            SELECT COALESCE(SUM(AC.num_rows * AC.num_columns), 0)
+            FROM Aircraft_Class AC
+            WHERE AC.aircraft_id = F.aircraft_id AND AC.is_business = 1
+        ) - (
+            SELECT COUNT(*)
+            FROM Order_Seats OS
+            WHERE OS.flight_id = F.flight_id
+              AND OS.is_business = 1
+              AND OS.is_live = 1
+        ),
+        F.inventory_version = F.inventory_version + 1
+"""
+
+def _inventory_version(flight_id):
+    row = db.query_db("SELECT inventory_version FROM Flight WHERE flight_id = %s", (flight_id,), one=True)
+    return row['inventory_version'] if row else None
+
+def reserve_seats(flight_id, economy_count, business_count):
+    """
+    Decrements the flight's seat counters. Must run inside the booking transaction:
+    the UPDATE locks the flight row, so concurrent bookings of the same flight
+    are serialized and the counters cannot go below zero.
+    Returns the flight's new inventory version, or None if not enough seats are left.
+    """
+    updated = db.execute_db("""
+        UPDATE Flight
+        SET economy_seats_left = economy_seats_left - %s,
+            business_seats_left = business_seats_left - %s,
+            inventory_version = inventory_version + 1
+        WHERE flight_id = %s
+          AND economy_seats_left >= %s AND business_seats_left >= %s
+    """, (economy_count, business_count, flight_id, economy_count, business_count), rowcount=True)
+    if updated != 1:
+        return None
+    return _inventory_version(flight_id)
+
+def release_order_seats(order_code):
+    """
+    Gives the seats of a cancelled order back to its flight's counters.
+    Returns the flight id, its new inventory version and the released seats
+    (see record_seats), or None if the order has no seats.
+    """
+    seats = db.query_db("""
+        SELECT flight_id, is_business, `row_number`, `column_number`
+        FROM Order_Seats
+        WHERE order_code = %s AND is_live = 1
+    """, (order_code,))
+    if not seats:
+        return None
+
+    flight_id = seats[0]['flight_id']
+    business_count = sum(1 for s in seats if s['is_business'])
+    db.execute_db("UPDATE Order_Seats SET is_live = NULL WHERE order_code = %s", (order_code,))
+    db.execute_db("""
+        UPDATE Flight
+        SET economy_seats_left = economy_seats_left + %s,
+            business_seats_left = business_seats_left + %s,
+            inventory_version = inventory_version + 1
+        WHERE flight_id = %s
+    """, (len(seats) - business_count, business_count, flight_id))
+
+    return {
+        'flight_id': flight_id,
+        'inventory_version': _inventory_version(flight_id),
+        'seats': [(bool(s['is_business']), s['row_number'], s['column_number']) for s in seats]
+    }
+
+def recount_seats(flight_id):
+    """Recomputes the seat counters of one flight."""
+    db.execute_db(RECOUNT_SEATS_SQL + " WHERE F.flight_id = %s", (flight_id,))
+
+def release_flight_seats(flight_id):
+    """Frees every seat of a flight whose orders were all cancelled, and recounts it."""
+    db.execute_db("UPDATE Order_Seats SET is_live = NULL WHERE flight_id = %s AND is_live = 1", (flight_id,))
+    recount_seats(flight_id)
+
+class CabinBitmap:
+    """Occupancy of one cabin class: bit (row - 1) * cols + (col - 1) is set when the seat is taken."""
+
+    __slots__ = ('rows', 'cols', 'bits', 'taken')
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.bits = 0
+        self.taken = 0
+
+    @property
+    def capacity(self):
+        return self.rows * self.cols
+
+    @property
+    def has_free(self):
+        return self.taken < self.capacity
+
+    def _bit(self, row, col):
+        row, col = int(row), int(col)
+        if not (1 <= row <= self.rows and 1 <= col <= self.cols):
+            return None
+        return 1 << ((row - 1) * self.cols + (col - 1))
+
+    def is_taken(self, row, col):
+        bit = self._bit(row, col)
+        return bit is not None and bool(self.bits & bit)
+
+    def encode(self):
+        """Base64 of the bitmap, least significant bit first (seat i is bit i % 8 of byte i // 8)."""
+        size = (self.capacity + 7) // 8
+        return base64.b64encode(self.bits.to_bytes(size, 'little')).decode('ascii')
+
+    def copy(self):
+        cabin = CabinBitmap(self.rows, self.cols)
+        cabin.bits = self.bits
+        cabin.taken = self.taken
+        return cabin
+
+    def set(self, row, col, taken=True):
+        bit = self._bit(row, col)
+        if bit is None or bool(self.bits & bit) == taken:
+            return
+        self.bits ^= bit
+        self.taken += 1 if taken else -1
+
+    def mask(self, seats):
+        """Bitmap of the given (row, col) seats (seats outside the cabin are ignored)."""
+        bits = 0
+        for row, col in seats:
+            bit = self._bit(row, col)
+            if bit is not None:
+                bits |= bit
+        return bits
+
+    def find_adjacent(self, count, blocked=0):
+        """
+        Returns (row, first_col) of the best block of `count` free adjacent seats in one
+        row (the front-most row, and in it the block closest to the middle of the row),
+        or None. Seats in the `blocked` bitmap count as taken. Works on the whole cabin
+        bitmap at once: `count` shift-and-mask steps instead of a loop over every seat.
+        """
+        if count < 1 or count > self.cols:
+            return None
+        free = ~(self.bits | blocked) & ((1 << self.capacity) - 1)
+        # Bit i of `starts` stays set when seats i .. i + count - 1 are all free
+        starts = free
+        for k in range(1, count):
+            starts &= free >> k
+        # Drop blocks that would wrap into the next row: the valid start columns of one
+        # row, repeated for every row ((2^(rows*cols) - 1) / (2^cols - 1) = 1 bit per row)
+        row_starts = (1 << (self.cols - count + 1)) - 1
+        starts &= row_starts * (((1 << self.capacity) - 1) // ((1 << self.cols) - 1))
+        if not starts:
+            return None
+
+        row_index = ((starts & -starts).bit_length() - 1) // self.cols
+        row_mask = (starts >> (row_index * self.cols)) & row_starts
+        middle = (self.cols - count) / 2
+        best = min((c for c in range(self.cols - count + 1) if row_mask >> c & 1),
+                   key=lambda c: abs(c - middle))
+        return row_index + 1, best + 1
+
+class FlightSeatMap:
+    """Seat occupancy of one flight, valid for a single inventory version."""
+
+    def __init__(self, version, cabins):
+        self.version = version
+        self.cabins = cabins  # is_business -> CabinBitmap
+
+    def cabin(self, is_business):
+        return self.cabins.get(bool(is_business))
+
+    def has_free(self, is_business):
+        cabin = self.cabin(is_business)
+        return cabin is not None and cabin.has_free
+
+    def is_taken(self, is_business, row, col):
+        cabin = self.cabin(is_business)
+        return cabin is not None and cabin.is_taken(row, col)
+
+    def suggest_adjacent(self, count, blocked=None):
+        """
+        Best block of `count` adjacent free seats in each class, as {is_business: [(row, col)]}
+        (None for a class without such a block). `blocked` maps is_business to extra
+        (row, col) seats to avoid, e.g. seats held by other customers.
+        """
+        suggestions = {}
+        for is_business, cabin in self.cabins.items():
+            extra = cabin.mask((blocked or {}).get(is_business, ()))
+            block = cabin.find_adjacent(count, extra)
+            if block:
+                row, first_col = block
+                suggestions[is_business] = [(row, col) for col in range(first_col, first_col + count)]
+            else:
+                suggestions[is_business] = None
+        return suggestions
+
+    def to_dict(self):
+        """Wire format of the seat map: cabin dimensions plus an encoded occupancy bitmap per class."""
+        cabins = {}
+        for is_business, cabin in self.cabins.items():
+            cabins['business' if is_business else 'economy'] = {
+                'rows': cabin.rows,
+                'cols': cabin.cols,
+                'taken': cabin.taken,
+                'occupancy': cabin.encode()
+            }
+        return {'version': self.version, 'cabins': cabins}
+
+def _load_seat_map(flight_id, aircraft_id, version):
+    cabins = {}
+    for ac in db.query_db("""
+        SELECT is_business, num_rows, num_columns FROM Aircraft_Class WHERE aircraft_id = %s
+    """, (aircraft_id,)):
+        cabins[bool(ac['is_business'])] = CabinBitmap(ac['num_rows'], ac['num_columns'])
+
+    seat_map = FlightSeatMap(version, cabins)
+    # Index-only read of uq_order_seats_live
+    for s in db.query_db("""
+        SELECT is_business, `row_number`, `column_number`
+        FROM Order_Seats
+        WHERE flight_id = %s AND is_live = 1
+    """, (flight_id,)):
+        cabin = seat_map.cabin(s['is_business'])
+        if cabin:
+            cabin.set(s['row_number'], s['column_number'])
+    return seat_map
+
+# Process-local seat maps keyed by flight id. An entry is only used while its version
+# matches the flight's inventory_version, so writes made by other processes
+# (or a flight-level recount) simply cause a rebuild on the next read.
+_seat_maps = OrderedDict()
+_seat_maps_lock = threading.Lock()
+
+def get_seat_map(flight_id, aircraft_id, version):
+    """
+    Returns the FlightSeatMap of a flight at the given inventory version,
+    building it from the database on a miss.
+    """
+    key = int(flight_id)
+    with _seat_maps_lock:
+        seat_map = _seat_maps.get(key)
+        if seat_map is not None and seat_map.version == version:
+            _seat_maps.move_to_end(key)
+            return seat_map
+
+    seat_map = _load_seat_map(key, aircraft_id, version)
+    with _seat_maps_lock:
+        _seat_maps[key] = seat_map
+        _seat_maps.move_to_end(key)
+        while len(_seat_maps) > SEAT_MAP_CACHE_SIZE:
+            _seat_maps.popitem(last=False)
+    return seat_map
+
+def record_seats(flight_id, version, seats, taken=True):
+    """
+    Applies a committed booking (taken=True) or release (taken=False) to the cached
+    seat map and notifies the flight's live seat map streams. `seats` is a list of
+    (is_business, row, col); `version` is the flight's inventory version after the
+    change. The entry is dropped if it was not at the version just before the change.
+    Cached seat maps are never modified: requests may be reading one without the lock,
+    so the change is applied to a copy that replaces the cached entry.
+    """
+    key = int(flight_id)
+    try:
+        seat_events.publish_seats(key, version, seats, taken)
+    except (TypeError, ValueError):
+        # Clients resync on the next version they see
+        pass
+    with _seat_maps_lock:
+        seat_map = _seat_maps.get(key)
+        if seat_map is None:
+            return
+        if version is None or seat_map.version != version - 1:
+            del _seat_maps[key]
+            return
+        updated = FlightSeatMap(version, {is_business: cabin.copy()
+                                          for is_business, cabin in seat_map.cabins.items()})
+        try:
+            for is_business, row, col in seats:
+                cabin = updated.cabin(is_business)
+                if cabin:
+                    cabin.set(row, col, taken)
+        except (TypeError, ValueError):
+            # Unexpected seat values: rebuild from the database on next use
+            del _seat_maps[key]
+            return
+        _seat_maps[key] = updated
+
+def record_recount(flight_id):
+    """
+    Applies a committed recount of a flight's seats (e.g. release_flight_seats):
+    drops its cached seat map and tells its live seat map streams to resync.
+    """
+    key = int(flight_id)
+    with _seat_maps_lock:
+        _seat_maps.pop(key, None)
+    seat_events.publish_resync(key)
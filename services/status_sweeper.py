@@ -0,0 +1,50 @@
+import os
+import threading
+import logging
+from services.flight_service import update_all_flight_statuses
+from services.seat_holds import sweep_expired_holds
+
+logger = logging.getLogger('flytau.status_sweeper')
+
+# Seconds between two sweeps of departed flights
+STATUS_SWEEP_INTERVAL = int(os.getenv('STATUS_SWEEP_INTERVAL', '60'))
+
+_sweeper_thread = None
+_sweeper_lock = threading.Lock()
+_stop_event = threading.Event()
+
+def _run(app, interval):
+    while True:
+        try:
+            # The sweep uses db.execute_db, which needs an app context
+            with app.app_context():
+                update_all_flight_statuses()
+        except Exception:
+            logger.exception("Flight status sweep failed")
+        try:
+            with app.app_context():
+                sweep_expired_holds()
+        except Exception:
+            logger.exception("Seat hold sweep failed")
+        if _stop_event.wait(interval):
+            break
+
+def start_status_sweeper(app, interval=STATUS_SWEEP_INTERVAL):
+    """
+    Starts a background thread that marks departed 'Active' flights as 'Completed'
+    and deletes expired seat holds every `interval` seconds. Readers compute the
+    effective status on read (see EFFECTIVE_STATUS_SQL) and ignore expired holds,
+    so results stay correct between sweeps.
+    Only one sweeper is started per process.
+    """
+    global _sweeper_thread
+    with _sweeper_lock:
+        if _sweeper_thread is not None and _sweeper_thread.is_alive():
+            return _sweeper_thread
+        _stop_event.clear()
+        _sweeper_thread = threading.Thread(target=_run, args=(app, interval), name='flight-status-sweeper', daemon=True)
+        _sweeper_thread.start()
+        return _sweeper_thread
+
+def stop_status_sweeper():
+    _stop_event.set()
@@ -0,0 +1,54 @@
+-- Surrogate flight key: Flight gets an integer flight_id primary key and the
+-- tables that referenced the (source_airport_id, dest_airport_id, departure_time)
+-- composite key reference flight_id instead.
+-- Upgrades a database created from the original schema.sql (before migrations
+-- existed). Foreign key and index names are the ones MySQL generated for it
+-- (<table>_ibfk_<n> in declaration order, indexes named after their first column).
+
+-- 1. Drop the composite foreign keys (and the indexes MySQL created for them)
+ALTER TABLE Order_Table DROP FOREIGN KEY Order_Table_ibfk_2, DROP INDEX source_airport_id;
+ALTER TABLE Employee_Flight_Assignment DROP FOREIGN KEY Employee_Flight_Assignment_ibfk_2, DROP INDEX source_airport_id;
+
+-- 2. Flight: surrogate primary key, the composite key stays unique. The unique key
+-- is added first so Flight's own source airport foreign key always has an index
+ALTER TABLE Flight ADD UNIQUE KEY uq_flight_key (source_airport_id, dest_airport_id, departure_time);
+ALTER TABLE Flight
+    DROP PRIMARY KEY,
+    ADD COLUMN flight_id INT NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST;
+
+-- 3. Orders
+ALTER TABLE Order_Table ADD COLUMN flight_id INT NULL AFTER customer_email;
+
+UPDATE Order_Table O
+JOIN Flight F ON O.source_airport_id = F.source_airport_id
+             AND O.dest_airport_id = F.dest_airport_id
+             AND O.departure_time = F.departure_time
+SET O.flight_id = F.flight_id;
+
+ALTER TABLE Order_Table ADD FOREIGN KEY (flight_id) REFERENCES Flight(flight_id);
+
+-- 4. Crew assignments
+ALTER TABLE Employee_Flight_Assignment ADD COLUMN flight_id INT NULL AFTER employee_id;
+
+UPDATE Employee_Flight_Assignment EFA
+JOIN Flight F ON EFA.source_airport_id = F.source_airport_id
+             AND EFA.dest_airport_id = F.dest_airport_id
+             AND EFA.departure_time = F.departure_time
+SET EFA.flight_id = F.flight_id;
+
+ALTER TABLE Employee_Flight_Assignment
+    MODIFY flight_id INT NOT NULL,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (employee_id, flight_id),
+    ADD FOREIGN KEY (flight_id) REFERENCES Flight(flight_id);
+
+-- 5. Order seats carry the flight of their order
+ALTER TABLE Order_Seats ADD COLUMN flight_id INT NULL AFTER `column_number`;
+
+UPDATE Order_Seats OS
+JOIN Order_Table O ON OS.order_code = O.order_code
+SET OS.flight_id = O.flight_id;
+
+ALTER TABLE Order_Seats
+    MODIFY flight_id INT NOT NULL,
+    ADD FOREIGN KEY (flight_id) REFERENCES Flight(flight_id);
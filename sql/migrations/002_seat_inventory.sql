@@ -0,0 +1,44 @@
+-- Seat inventory: per-flight seat counters, live seats of orders, seat holds and
+-- the order code sequence. Runs after 001 (Order_Seats.flight_id).
+
+-- 1. Seat counters, filled in by the recount at the end of this migration
+ALTER TABLE Flight
+    ADD COLUMN economy_seats_left INT NOT NULL DEFAULT 0 AFTER business_price,
+    ADD COLUMN business_seats_left INT NOT NULL DEFAULT 0 AFTER economy_seats_left,
+    ADD COLUMN inventory_version INT NOT NULL DEFAULT 0 AFTER business_seats_left;
+
+-- 2. Seats of cancelled orders no longer occupy their seat
+ALTER TABLE Order_Seats ADD COLUMN is_live TINYINT NULL DEFAULT 1 AFTER flight_id;
+
+UPDATE Order_Seats OS
+JOIN Order_Table O ON OS.order_code = O.order_code
+SET OS.is_live = NULL
+WHERE O.order_status IN ('Cancelled', 'Customer Cancelled', 'System Cancelled');
+
+-- Fails if live orders share a seat of a flight: those bookings have to be
+-- resolved by hand first. Also replaces the index of the flight_id foreign key
+ALTER TABLE Order_Seats
+    ADD UNIQUE INDEX uq_order_seats_live (flight_id, is_business, `row_number`, `column_number`, is_live);
+
+-- 3. Seat holds
+CREATE TABLE Seat_Hold (
+    flight_id INT NOT NULL,
+    is_business BOOLEAN NOT NULL,
+    `row_number` INT NOT NULL,
+    `column_number` INT NOT NULL,
+    hold_token CHAR(32) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (flight_id, is_business, `row_number`, `column_number`),
+    FOREIGN KEY (flight_id) REFERENCES Flight(flight_id),
+    INDEX idx_seat_hold_token (hold_token),
+    INDEX idx_seat_hold_expiry (expires_at)
+);
+
+-- 4. Order code allocator counter (starts empty: codes already used are skipped)
+CREATE TABLE Order_Code_Sequence (
+    name VARCHAR(50) PRIMARY KEY,
+    next_value BIGINT NOT NULL
+);
+
+-- 5. migrate.py recounts the seats of every flight (RECOUNT_SEATS_SQL) after this file
+-- @recount_seats
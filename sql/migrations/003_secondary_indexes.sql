@@ -0,0 +1,16 @@
+-- Secondary indexes for the hot query shapes (verified by `python migrate.py check`).
+
+-- Customer search: active flights in (departure_time, source, dest) order (keyset pagination)
+ALTER TABLE Flight ADD INDEX idx_flight_search (flight_status, departure_time, source_airport_id, dest_airport_id);
+
+-- Aircraft availability: an aircraft's active flights around a departure time
+ALTER TABLE Flight ADD INDEX idx_flight_aircraft (aircraft_id, flight_status, departure_time);
+
+-- Crew availability: an employee's assignments around a departure time
+ALTER TABLE Employee_Flight_Assignment ADD INDEX idx_assignment_employee (employee_id, departure_time);
+
+-- My orders: a customer's orders newest first (keyset pagination)
+ALTER TABLE Order_Table ADD INDEX idx_order_customer (customer_email, order_date, order_code);
+
+-- Cancellation report: orders per month, read from the index alone
+ALTER TABLE Order_Table ADD INDEX idx_order_date (order_date, order_status);
@@ -1,4 +1,7 @@
 -- 1. Infrastructure & Planes
+DROP TABLE IF EXISTS Schema_Migration;
+DROP TABLE IF EXISTS Order_Code_Sequence;
+DROP TABLE IF EXISTS Seat_Hold;
 DROP TABLE IF EXISTS Order_Seats;
 DROP TABLE IF EXISTS Order_Table;
 DROP TABLE IF EXISTS Registered_Customer;
@@ -86,6 +89,7 @@ CREATE TABLE Manager (
 -- 3. Flight Operations
 
 CREATE TABLE Flight (
+    flight_id INT AUTO_INCREMENT PRIMARY KEY,
     source_airport_id INT NOT NULL,
     dest_airport_id INT NOT NULL,
     departure_time DATETIME NOT NULL,
@@ -93,21 +97,33 @@ CREATE TABLE Flight (
     aircraft_id INT,
     economy_price DECIMAL(10, 2),
     business_price DECIMAL(10, 2),
-    PRIMARY KEY (source_airport_id, dest_airport_id, departure_time),
+    -- Seat inventory, maintained transactionally on booking and cancellation
+    economy_seats_left INT NOT NULL DEFAULT 0,
+    business_seats_left INT NOT NULL DEFAULT 0,
+    inventory_version INT NOT NULL DEFAULT 0,
+    -- Natural key; other tables reference flights by flight_id
+    UNIQUE KEY uq_flight_key (source_airport_id, dest_airport_id, departure_time),
     FOREIGN KEY (source_airport_id) REFERENCES Airport(airport_id),
     FOREIGN KEY (dest_airport_id) REFERENCES Airport(airport_id),
-    FOREIGN KEY (aircraft_id) REFERENCES Aircraft(aircraft_id)
+    FOREIGN KEY (aircraft_id) REFERENCES Aircraft(aircraft_id),
+    -- Customer search: active flights in (departure_time, source, dest) order (keyset pagination)
+    INDEX idx_flight_search (flight_status, departure_time, source_airport_id, dest_airport_id),
+    -- Aircraft availability: an aircraft's active flights around a departure time
+    INDEX idx_flight_aircraft (aircraft_id, flight_status, departure_time)
 );
 
 CREATE TABLE Employee_Flight_Assignment (
     employee_id CHAR(9) NOT NULL,
+    flight_id INT NOT NULL,
+    -- Copy of the flight's natural key (immutable), for filtering without a join
     source_airport_id INT NOT NULL,
     dest_airport_id INT NOT NULL,
     departure_time DATETIME NOT NULL,
-    PRIMARY KEY (employee_id, source_airport_id, dest_airport_id, departure_time),
+    PRIMARY KEY (employee_id, flight_id),
     FOREIGN KEY (employee_id) REFERENCES Flight_Crew(id_number),
-    FOREIGN KEY (source_airport_id, dest_airport_id, departure_time)
-        REFERENCES Flight(source_airport_id, dest_airport_id, departure_time)
+    FOREIGN KEY (flight_id) REFERENCES Flight(flight_id),
+    -- Crew availability: an employee's assignments around a departure time
+    INDEX idx_assignment_employee (employee_id, departure_time)
 );
 
 -- 4. Customers & Orders
@@ -141,12 +157,17 @@ CREATE TABLE Order_Table (
     total_payment DECIMAL(10,2),
     order_status VARCHAR(50),
     customer_email VARCHAR(100),
+    flight_id INT,
+    -- Copy of the flight's natural key (immutable), for display and filtering without a join
     source_airport_id INT,
     dest_airport_id INT,
     departure_time DATETIME,
     FOREIGN KEY (customer_email) REFERENCES User(email),
-    FOREIGN KEY (source_airport_id, dest_airport_id, departure_time) 
-        REFERENCES Flight(source_airport_id, dest_airport_id, departure_time)
+    FOREIGN KEY (flight_id) REFERENCES Flight(flight_id),
+    -- My orders: a customer's orders newest first (keyset pagination)
+    INDEX idx_order_customer (customer_email, order_date, order_code),
+    -- Cancellation report: orders per month, read from the index alone
+    INDEX idx_order_date (order_date, order_status)
 );
 
 CREATE TABLE Order_Seats (
@@ -155,8 +176,45 @@ CREATE TABLE Order_Seats (
     is_business BOOLEAN NOT NULL,
     `row_number` INT NOT NULL,
     `column_number` INT NOT NULL,
+    -- Flight of the order, so seat occupancy is read without joining Order_Table
+    flight_id INT NOT NULL,
+    -- 1 while the order is live, NULL once it is cancelled (NULLs never collide in a UNIQUE index)
+    is_live TINYINT NULL DEFAULT 1,
     PRIMARY KEY (order_code, aircraft_id, is_business, `row_number`, `column_number`),
     FOREIGN KEY (order_code) REFERENCES Order_Table(order_code),
     FOREIGN KEY (aircraft_id, is_business, `row_number`, `column_number`)
-        REFERENCES Seat(aircraft_id, is_business, `row_number`, `column_number`)
+        REFERENCES Seat(aircraft_id, is_business, `row_number`, `column_number`),
+    FOREIGN KEY (flight_id) REFERENCES Flight(flight_id),
+    -- A seat of a flight can be held by one live order only; also covers occupancy reads
+    UNIQUE INDEX uq_order_seats_live (flight_id, is_business, `row_number`, `column_number`, is_live)
+);
+
+-- Short-lived seat reservations taken while a customer is selecting seats.
+-- One row per held seat: the primary key makes concurrent holds on the same
+-- seat conflict on that row only. Expired rows are removed by the sweeper.
+CREATE TABLE Seat_Hold (
+    flight_id INT NOT NULL,
+    is_business BOOLEAN NOT NULL,
+    `row_number` INT NOT NULL,
+    `column_number` INT NOT NULL,
+    hold_token CHAR(32) NOT NULL,
+    expires_at DATETIME NOT NULL,
+    PRIMARY KEY (flight_id, is_business, `row_number`, `column_number`),
+    FOREIGN KEY (flight_id) REFERENCES Flight(flight_id),
+    INDEX idx_seat_hold_token (hold_token),
+    INDEX idx_seat_hold_expiry (expires_at)
+);
+
+-- Counter behind the order code allocator (services/order_codes.py);
+-- processes reserve blocks of sequence numbers from it
+CREATE TABLE Order_Code_Sequence (
+    name VARCHAR(50) PRIMARY KEY,
+    next_value BIGINT NOT NULL
+);
+
+-- Migrations of sql/migrations applied to this database (see migrate.py)
+CREATE TABLE Schema_Migration (
+    version INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    applied_at DATETIME NOT NULL
 );
@@ -53,44 +53,9 @@ INSERT INTO Aircraft_Class (aircraft_id, is_business, num_rows, num_columns) VAL
 (6, TRUE, 2, 2),
 (6, FALSE, 5, 4);
 
--- Generate Seats for Plane 1 (Large)
--- Business
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(1, TRUE, 1, 1), (1, TRUE, 1, 2),
-(1, TRUE, 2, 1), (1, TRUE, 2, 2);
--- Economy
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(1, FALSE, 1, 1), (1, FALSE, 1, 2), (1, FALSE, 1, 3), (1, FALSE, 1, 4),
-(1, FALSE, 2, 1), (1, FALSE, 2, 2), (1, FALSE, 2, 3), (1, FALSE, 2, 4),
-(1, FALSE, 3, 1), (1, FALSE, 3, 2), (1, FALSE, 3, 3), (1, FALSE, 3, 4),
-(1, FALSE, 4, 1), (1, FALSE, 4, 2), (1, FALSE, 4, 3), (1, FALSE, 4, 4),
-(1, FALSE, 5, 1), (1, FALSE, 5, 2), (1, FALSE, 5, 3), (1, FALSE, 5, 4);
-
--- Generate Seats for Plane 3 (Small)
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(3, FALSE, 1, 1), (3, FALSE, 1, 2), (3, FALSE, 1, 3), (3, FALSE, 1, 4),
-(3, FALSE, 2, 1), (3, FALSE, 2, 2), (3, FALSE, 2, 3), (3, FALSE, 2, 4),
-(3, FALSE, 3, 1), (3, FALSE, 3, 2), (3, FALSE, 3, 3), (3, FALSE, 3, 4),
-(3, FALSE, 4, 1), (3, FALSE, 4, 2), (3, FALSE, 4, 3), (3, FALSE, 4, 4),
-(3, FALSE, 5, 1), (3, FALSE, 5, 2), (3, FALSE, 5, 3), (3, FALSE, 5, 4);
-
--- Plane 2 (Large)
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(2, TRUE, 1, 1), (2, TRUE, 1, 2), (2, TRUE, 2, 1), (2, TRUE, 2, 2);
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(2, FALSE, 1, 1), (2, FALSE, 1, 2), (2, FALSE, 1, 3), (2, FALSE, 1, 4),
-(2, FALSE, 2, 1), (2, FALSE, 2, 2), (2, FALSE, 2, 3), (2, FALSE, 2, 4),
-(2, FALSE, 3, 1), (2, FALSE, 3, 2), (2, FALSE, 3, 3), (2, FALSE, 3, 4),
-(2, FALSE, 4, 1), (2, FALSE, 4, 2), (2, FALSE, 4, 3), (2, FALSE, 4, 4),
-(2, FALSE, 5, 1), (2, FALSE, 5, 2), (2, FALSE, 5, 3), (2, FALSE, 5, 4);
-
--- Plane 4 (Small)
-INSERT INTO Seat (aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(4, FALSE, 1, 1), (4, FALSE, 1, 2), (4, FALSE, 1, 3), (4, FALSE, 1, 4),
-(4, FALSE, 2, 1), (4, FALSE, 2, 2), (4, FALSE, 2, 3), (4, FALSE, 2, 4),
-(4, FALSE, 3, 1), (4, FALSE, 3, 2), (4, FALSE, 3, 3), (4, FALSE, 3, 4),
-(4, FALSE, 4, 1), (4, FALSE, 4, 2), (4, FALSE, 4, 3), (4, FALSE, 4, 4),
-(4, FALSE, 5, 1), (4, FALSE, 5, 2), (4, FALSE, 5, 3), (4, FALSE, 5, 4);
+-- Seats are generated from the Aircraft_Class rows above by init_db.py
+-- (batched multi-row inserts instead of listing every seat here)
+-- @generate_seats
 
 
 -- 5. Employees
@@ -167,58 +132,58 @@ INSERT INTO Phone (email, phone_number) VALUES
 
 -- 7. Flights
 -- Flight 1: TLV->JFK (Long), Plane 1 (Large), 2026-01-01 08:00
-INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
-(1, 2, '2026-01-01 08:00:00', 1, 'Active', 800.00, 1500.00);
+INSERT INTO Flight (flight_id, source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
+(1, 1, 2, '2026-01-01 08:00:00', 1, 'Active', 800.00, 1500.00);
 
 -- Flight 2: TLV->LHR (Short), Plane 3 (Small), 2026-01-02 10:00
-INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
-(1, 3, '2026-01-02 10:00:00', 3, 'Active', 400.00, 900.00);
+INSERT INTO Flight (flight_id, source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
+(2, 1, 3, '2026-01-02 10:00:00', 3, 'Active', 400.00, 900.00);
 
 -- Flight 3: JFK->TLV (Long), Plane 2 (Large), 2026-01-03 12:00
-INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
-(2, 1, '2026-01-03 12:00:00', 2, 'Active', 850.00, 1600.00);
+INSERT INTO Flight (flight_id, source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
+(3, 2, 1, '2026-01-03 12:00:00', 2, 'Active', 850.00, 1600.00);
 
 -- Flight 4: LHR->TLV (Short), Plane 4 (Small), 2026-01-04 14:00
-INSERT INTO Flight (source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
-(3, 1, '2026-01-04 14:00:00', 4, 'Active', 450.00, 950.00);
+INSERT INTO Flight (flight_id, source_airport_id, dest_airport_id, departure_time, aircraft_id, flight_status, economy_price, business_price) VALUES
+(4, 3, 1, '2026-01-04 14:00:00', 4, 'Active', 450.00, 950.00);
 
 -- 8. Crew Assignments
-INSERT INTO Employee_Flight_Assignment (employee_id, source_airport_id, dest_airport_id, departure_time) VALUES
-('300000001', 1, 2, '2026-01-01 08:00:00'),
-('300000002', 1, 2, '2026-01-01 08:00:00'),
-('300000003', 1, 2, '2026-01-01 08:00:00'),
-('400000001', 1, 2, '2026-01-01 08:00:00'),
-('400000002', 1, 2, '2026-01-01 08:00:00'),
-('400000003', 1, 2, '2026-01-01 08:00:00'),
-('400000004', 1, 2, '2026-01-01 08:00:00'),
-('400000005', 1, 2, '2026-01-01 08:00:00'),
-('400000006', 1, 2, '2026-01-01 08:00:00');
+INSERT INTO Employee_Flight_Assignment (employee_id, flight_id, source_airport_id, dest_airport_id, departure_time) VALUES
+('300000001', 1, 1, 2, '2026-01-01 08:00:00'),
+('300000002', 1, 1, 2, '2026-01-01 08:00:00'),
+('300000003', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000001', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000002', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000003', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000004', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000005', 1, 1, 2, '2026-01-01 08:00:00'),
+('400000006', 1, 1, 2, '2026-01-01 08:00:00');
 
 -- 9. Orders
 -- Order 1: Reg1, Flight 1, 1 Seat (Business)
-INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, source_airport_id, dest_airport_id, departure_time) VALUES
-(1, '2025-12-01', 1500.00, 'Active', 'reg1@test.com', 1, 2, '2026-01-01 08:00:00');
+INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, flight_id, source_airport_id, dest_airport_id, departure_time) VALUES
+(1, '2025-12-01', 1500.00, 'Active', 'reg1@test.com', 1, 1, 2, '2026-01-01 08:00:00');
 
-INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(1, 1, TRUE, 1, 1);
+INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`, flight_id, is_live) VALUES
+(1, 1, TRUE, 1, 1, 1, 1);
 
 -- Order 2: Reg2, Flight 2, 1 Seat (Economy)
-INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, source_airport_id, dest_airport_id, departure_time) VALUES
-(2, '2025-12-02', 500.00, 'Active', 'reg2@test.com', 1, 3, '2026-01-02 10:00:00');
+INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, flight_id, source_airport_id, dest_airport_id, departure_time) VALUES
+(2, '2025-12-02', 500.00, 'Active', 'reg2@test.com', 2, 1, 3, '2026-01-02 10:00:00');
 
-INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(2, 3, FALSE, 1, 1);
+INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`, flight_id, is_live) VALUES
+(2, 3, FALSE, 1, 1, 2, 1);
 
 -- Order 3: Guest1, Flight 1, 1 Seat (Economy)
-INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, source_airport_id, dest_airport_id, departure_time) VALUES
-(3, '2025-12-03', 800.00, 'Active', 'guest1@test.com', 1, 2, '2026-01-01 08:00:00');
+INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, flight_id, source_airport_id, dest_airport_id, departure_time) VALUES
+(3, '2025-12-03', 800.00, 'Active', 'guest1@test.com', 1, 1, 2, '2026-01-01 08:00:00');
 
-INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(3, 1, FALSE, 1, 1);
+INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`, flight_id, is_live) VALUES
+(3, 1, FALSE, 1, 1, 1, 1);
 
 -- Order 4: Guest2, Flight 3, 1 Seat (Business)
-INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, source_airport_id, dest_airport_id, departure_time) VALUES
-(4, '2025-12-04', 1600.00, 'Active', 'guest2@test.com', 2, 1, '2026-01-03 12:00:00');
+INSERT INTO Order_Table (order_code, order_date, total_payment, order_status, customer_email, flight_id, source_airport_id, dest_airport_id, departure_time) VALUES
+(4, '2025-12-04', 1600.00, 'Active', 'guest2@test.com', 3, 2, 1, '2026-01-03 12:00:00');
 
-INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`) VALUES
-(4, 2, TRUE, 1, 1);
\ No newline at end of file
+INSERT INTO Order_Seats (order_code, aircraft_id, is_business, `row_number`, `column_number`, flight_id, is_live) VALUES
+(4, 2, TRUE, 1, 1, 3, 1);
\ No newline at end of file
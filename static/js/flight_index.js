@@ -25,3 +25,40 @@
     window.location.href = showAllUrl;
   }
 })();
+
+// Airport autocomplete: suggestions come from the server-side airport index
+(function () {
+  document
+    .querySelectorAll("[data-airport-autocomplete]")
+    .forEach(function (input) {
+      const options = document.getElementById(input.getAttribute("list"));
+      const url = input.dataset.airportAutocomplete;
+      let timeout = null;
+
+      input.addEventListener("input", function () {
+        if (timeout) {
+          clearTimeout(timeout);
+        }
+        const query = input.value.trim();
+        if (!query) {
+          options.innerHTML = "";
+          return;
+        }
+        timeout = setTimeout(function () {
+          fetch(`${url}?q=${encodeURIComponent(query)}`)
+            .then((response) => response.json())
+            .then((airports) => {
+              options.innerHTML = "";
+              airports.forEach(function (airport) {
+                const option = document.createElement("option");
+                option.value = airport.airport_name;
+                options.appendChild(option);
+              });
+            })
+            .catch((error) => {
+              console.error("Error:", error);
+            });
+        }, 150);
+      });
+    });
+})();
@@ -5,6 +5,188 @@
 let selectedSeats = [];
 let classToggleTimeout = null;
 
+// Seat map rendering
+// The server sends cabin dimensions plus a base64 occupancy bitmap per class:
+// seat i = (row - 1) * cols + (col - 1) is taken when bit i % 8 of byte i / 8 is set.
+function decodeOccupancy(encoded) {
+  const raw = atob(encoded);
+  const bytes = new Uint8Array(raw.length);
+  for (let i = 0; i < raw.length; i++) {
+    bytes[i] = raw.charCodeAt(i);
+  }
+  return bytes;
+}
+
+function createSeat(row, col, cls, isTaken) {
+  const isBusiness = cls === "business";
+  const seat = document.createElement("div");
+  seat.className = `seat ${isTaken ? "occupied" : "available"}`;
+  seat.dataset.row = row;
+  seat.dataset.col = col;
+  seat.dataset.class = cls;
+  seat.setAttribute("role", "button");
+  seat.tabIndex = 0;
+  seat.setAttribute(
+    "aria-label",
+    isTaken
+      ? `Seat ${row}${col} - Occupied`
+      : `Seat ${row}${col} - Available, click to select`
+  );
+  if (isTaken) seat.setAttribute("aria-disabled", "true");
+  seat.textContent = col;
+  seat.addEventListener("click", () => selectSeat(seat, isBusiness));
+  seat.addEventListener("keydown", (event) => {
+    if (event.key === "Enter" || event.key === " ") {
+      event.preventDefault();
+      selectSeat(seat, isBusiness);
+    }
+  });
+  return seat;
+}
+
+function renderCabin(container, cls, cabin) {
+  const occupancy = decodeOccupancy(cabin.occupancy);
+  const fragment = document.createDocumentFragment();
+
+  for (let r = 1; r <= cabin.rows; r++) {
+    const seatRow = document.createElement("div");
+    seatRow.className = "seat-row";
+
+    const label = document.createElement("span");
+    label.className = "row-label";
+    label.textContent = r;
+    seatRow.appendChild(label);
+
+    for (let c = 1; c <= cabin.cols; c++) {
+      const i = (r - 1) * cabin.cols + (c - 1);
+      const isTaken = (occupancy[i >> 3] >> (i & 7)) & 1;
+      seatRow.appendChild(createSeat(r, c, cls, isTaken === 1));
+    }
+    fragment.appendChild(seatRow);
+  }
+
+  container.innerHTML = "";
+  container.appendChild(fragment);
+}
+
+// Inventory version of the rendered map (null while loading)
+let seatMapVersion = null;
+// Live updates received while the map was loading
+let pendingSeatEvents = [];
+
+function loadSeatMap() {
+  const mapContainer = document.querySelector(".seat-map-container");
+  if (!mapContainer || !mapContainer.dataset.seatMapUrl) return;
+
+  seatMapVersion = null;
+  fetch(mapContainer.dataset.seatMapUrl)
+    .then((response) => response.json())
+    .then((data) => {
+      Object.entries(data.cabins || {}).forEach(([cls, cabin]) => {
+        const container = mapContainer.querySelector(
+          `.cabin[data-class="${cls}"]`
+        );
+        if (container) renderCabin(container, cls, cabin);
+      });
+      // Keep seats the user already picked, unless someone else took them
+      selectedSeats = selectedSeats.filter((s) => {
+        const seat = findSeat(s.class, s.row, s.col);
+        if (!seat || seat.classList.contains("occupied")) return false;
+        seat.classList.add("selected");
+        return true;
+      });
+      updateForm();
+
+      seatMapVersion = data.version;
+      const pending = pendingSeatEvents;
+      pendingSeatEvents = [];
+      pending.forEach(applySeatEvent);
+    })
+    .catch((error) => {
+      console.error("Error:", error);
+    });
+}
+
+function findSeat(cls, row, col) {
+  return document.querySelector(
+    `.cabin[data-class="${cls}"] .seat[data-row="${row}"][data-col="${col}"]`
+  );
+}
+
+function markSeat(seat, isTaken) {
+  const row = seat.dataset.row;
+  const col = seat.dataset.col;
+  seat.classList.toggle("occupied", isTaken);
+  seat.classList.toggle("available", !isTaken);
+  seat.setAttribute(
+    "aria-label",
+    isTaken
+      ? `Seat ${row}${col} - Occupied`
+      : `Seat ${row}${col} - Available, click to select`
+  );
+  if (isTaken) seat.setAttribute("aria-disabled", "true");
+  else seat.removeAttribute("aria-disabled");
+}
+
+function applySeatEvent(event) {
+  if (seatMapVersion === null) {
+    pendingSeatEvents.push(event);
+    return;
+  }
+  // Already part of the rendered map
+  if (event.version <= seatMapVersion) return;
+  // Missed an update (e.g. a change made through another server): reload the map
+  if (event.version !== seatMapVersion + 1) {
+    loadSeatMap();
+    return;
+  }
+
+  let lostSelection = false;
+  event.seats.forEach((s) => {
+    const seat = findSeat(s.class, s.row, s.col);
+    if (!seat) return;
+    if (event.taken && seat.classList.contains("selected")) {
+      seat.classList.remove("selected");
+      selectedSeats = selectedSeats.filter(
+        (sel) =>
+          !(
+            sel.class === s.class &&
+            sel.row === seat.dataset.row &&
+            sel.col === seat.dataset.col
+          )
+      );
+      lostSelection = true;
+    }
+    markSeat(seat, event.taken);
+  });
+  seatMapVersion = event.version;
+
+  if (lostSelection) {
+    updateForm();
+    if (window.popupManager) {
+      window.popupManager.warning(
+        "Some of your selected seats were just booked by another customer."
+      );
+    }
+  }
+}
+
+function subscribeSeatEvents() {
+  const mapContainer = document.querySelector(".seat-map-container");
+  if (!mapContainer || !mapContainer.dataset.seatEventsUrl || !window.EventSource)
+    return;
+
+  const source = new EventSource(mapContainer.dataset.seatEventsUrl);
+  source.addEventListener("seats", (e) => applySeatEvent(JSON.parse(e.data)));
+  // Sent on overflow, and on a reconnect when the flight changed while disconnected
+  source.addEventListener("resync", () => loadSeatMap());
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+  subscribeSeatEvents();
+  loadSeatMap();
+});
+
 function showClass(cls) {
   // Debounce rapid clicks to prevent UI lag
   if (classToggleTimeout) {
@@ -63,6 +245,7 @@ function clearSelection() {
     .querySelectorAll(".seat.selected")
     .forEach((el) => el.classList.remove("selected"));
   updateForm();
+  scheduleSeatHold();
 }
 
 function selectSeat(element, isBusiness) {
@@ -88,6 +271,61 @@ function selectSeat(element, isBusiness) {
 
   updateForm();
   updatePriceDisplay(cls);
+  scheduleSeatHold();
+}
+
+// Seat holds
+// The current selection is held on the server for a few minutes, so other
+// customers cannot book those seats while this one fills in the form.
+let seatHoldTimeout = null;
+
+function scheduleSeatHold() {
+  if (seatHoldTimeout) {
+    clearTimeout(seatHoldTimeout);
+  }
+  seatHoldTimeout = setTimeout(holdSelectedSeats, 300);
+}
+
+function holdSelectedSeats() {
+  const mapContainer = document.querySelector(".seat-map-container");
+  if (!mapContainer || !mapContainer.dataset.seatHoldUrl) return;
+
+  fetch(mapContainer.dataset.seatHoldUrl, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      flight_id: mapContainer.dataset.flightId,
+      seats: selectedSeats,
+    }),
+  })
+    .then((response) => response.json())
+    .then((data) => {
+      if (!data.conflicts || data.conflicts.length === 0) return;
+
+      data.conflicts.forEach((s) => {
+        const seat = findSeat(s.class, s.row, s.col);
+        if (!seat) return;
+        seat.classList.remove("selected");
+        markSeat(seat, true);
+        selectedSeats = selectedSeats.filter(
+          (sel) =>
+            !(
+              sel.class === s.class &&
+              sel.row === seat.dataset.row &&
+              sel.col === seat.dataset.col
+            )
+        );
+      });
+      updateForm();
+      if (window.popupManager) {
+        window.popupManager.warning(
+          "Some of the seats you selected are being booked by another customer."
+        );
+      }
+    })
+    .catch((error) => {
+      console.error("Error:", error);
+    });
 }
 
 function updateForm() {
@@ -128,3 +366,41 @@ function updateForm() {
   });
 }
 
+
+// Adjacent seats
+// Asks the server for the best block of N free seats in one row of the
+// class currently shown, and selects it.
+function suggestSeats() {
+  const mapContainer = document.querySelector(".seat-map-container");
+  const countInput = document.getElementById("seats-together-count");
+  if (!mapContainer || !mapContainer.dataset.seatSuggestUrl || !countInput)
+    return;
+
+  const count = parseInt(countInput.value, 10);
+  if (!count || count < 1) return;
+  const cls = document.getElementById("map-business").classList.contains("hidden")
+    ? "economy"
+    : "business";
+
+  fetch(`${mapContainer.dataset.seatSuggestUrl}&count=${count}`)
+    .then((response) => response.json())
+    .then((data) => {
+      const seats = data[cls];
+      if (!seats) {
+        if (window.popupManager) {
+          window.popupManager.warning(
+            `No ${count} adjacent ${cls} seats are available on this flight.`
+          );
+        }
+        return;
+      }
+      clearSelection();
+      seats.forEach((s) => {
+        const seat = findSeat(cls, s.row, s.col);
+        if (seat) selectSeat(seat, cls === "business");
+      });
+    })
+    .catch((error) => {
+      console.error("Error:", error);
+    });
+}